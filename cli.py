@@ -1,15 +1,26 @@
 import pathlib
 import json
 import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
-import shutil
 import random
 import re
+import sys
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
 from math import floor
 import pyperclip
 from colorama import Fore, Back, Style
 from langwich.core.rules_manager import RulesManager
+from langwich.core.metadata_store import SqliteMetadataStore
+from langwich.core.metadata_journal import MetadataJournal
+from langwich.core.backup_store import BackupStore
+from langwich.core.word_index import IndexRecord, MappedWordIndex, write_word_index
+from langwich.core.frequency import FrequencyTable, word_frequencies
+from langwich.core.review_store import ReviewStore
+from langwich.core import codec
 from langwich import IS_DEV_MODE
 # Ensure GNU readline is imported so built-in input() supports arrow-key editing
 try:
@@ -22,6 +33,7 @@ app_root_dir = pathlib.Path(__file__).resolve().parent
 
 data_dir = app_root_dir / "data"
 metadata_path = app_root_dir / "metadata.json"
+metadata_db_path = app_root_dir / "metadata.db"
 text_sents_dir = app_root_dir / "text_sentences"
 text_words_dir = app_root_dir / "text_words"
 texts_dir = app_root_dir / "texts"
@@ -29,6 +41,27 @@ words_dir = app_root_dir / "words"
 rules_dir = app_root_dir / "data/rules"
 langs_dir = app_root_dir / "langs"
 backups_dir = app_root_dir / "backups"
+backup_store_dir = backups_dir / "store"
+
+# Metadata backend: "json" (metadata.json), "sqlite" (metadata.db, one row per
+# text), "journal" (metadata.json plus an append-only metadata.journal.jsonl)
+# or "auto", which uses metadata.db once it has been created with the
+# "metadata_db import" command, and replays a journal if one is present.
+metadata_backend = "auto"
+# "json" (words/<lang>_index.json) or "binary" (memory-mapped words/<lang>_index.bin)
+word_index_format = "json"
+# Set per language by "frequent_rank" in languages.json: words ranked this high
+# or higher in the corpus frequency table are down-sampled like "frequents".
+frequent_rank = None
+# Worker processes used to (re)build a word index from many text_words files;
+# None means one per CPU, 1 parses them in this process.
+index_jobs = None
+# How text_words, text_sentences, metadata.json and the word index files are
+# written: "compact" (no whitespace, UTF-8 instead of \u escapes) or "pretty"
+# (indented by 2). Files in either format are read the same way.
+json_format = "compact"
+# Number of words "study due" reviews when no number is given.
+review_count = 20
 
 # [x] word: has a skip flag
 # word: has an index within a sentence (sent_index)
@@ -84,22 +117,27 @@ class Language:
         self._editable_word_keys = new_value
 
 class Text:
-    def __init__(self, hash=None):
+    """
+    A view of one text's metadata. The multipart chain (hash_list, prev_hash,
+    next_hash) is only looked up when one of them is first accessed.
+    """
+    __slots__ = ("hash", "filename", "type", "title", "url", "language", "lang_code",
+                 "created_on", "num_words", "num_uniq_words", "study_count",
+                 "last_study_date", "fulltext", "_hash_list")
+
+    def __init__(self, hash=None, metadata=None):
         if hash:
             self.hash = hash
-            metadata = get_metadata(self.hash)
-            prev_metadata = get_metadata(self.hash)
+            if metadata is None:
+                metadata = get_metadata(self.hash)
             created_on = metadata.get("created_on")
+            self._hash_list = None
         else:
             created_on = datetime.now()
             self.hash = generate_hash(created_on)
             metadata = {}
-            prev_metadata = {}
+            self._hash_list = [self.hash]
         self.filename = f"{self.hash}.txt"
-        self.hash_list = []
-        self.hash_list.append(self.hash)
-        self.next_hash = None
-        self.prev_hash = None
         self.type = metadata.get("type", None)
         self.title = metadata.get("title", "")
         self.url = metadata.get("url", "")
@@ -111,67 +149,35 @@ class Text:
         self.study_count = metadata.get("study_count", -1)
         self.last_study_date = metadata.get("last_study_date", None)
         self.fulltext = metadata.get("fulltext", False)
-        while True:
-            prev_hash = prev_metadata.get("prev_hash", None)
-            if prev_hash:
-                if not self.prev_hash:
-                    self.prev_hash = prev_hash
-                self.hash_list.insert(0, prev_hash)
-                prev_metadata = get_metadata(prev_hash)
-            else:
-                break
-        while True:
-            next_hash = metadata.get("next_hash", None)
-            if next_hash:
-                if not self.next_hash:
-                    self.next_hash = next_hash
-                self.hash_list.append(next_hash)
-                metadata = get_metadata(next_hash)
-            else:
-                break
 
-    #@property
-    def type(self):
-        return self._type
-    #@property
-    def title(self):
-        return self._title
-    #@property
-    def url(self):
-        return self._url
-    #@property
-    def language(self):
-        return self._language
-    #@property
-    def lang_code(self):
-        return self._lang_code
-    #@property
-    def created_on(self):
-        return self._created_on
-    #@property
-    def num_words(self):
-        return self._num_words
-    #@property
-    def num_uniq_words(self):
-        return self._num_uniq_words
+    @classmethod
+    def load_many(cls, hashes):
+        """Returns {hash: Text} for the given hashes from a single metadata read."""
+        metadata = get_metadata()
+        if not metadata:
+            return {}
+        return {hash: cls(hash, metadata[hash]) for hash in hashes if hash in metadata}
+
     @property
-    def study_count(self):
-        return self._study_count
-    #@property
     def hash_list(self):
+        if self._hash_list is None:
+            self._hash_list = list(get_text_chain(self.hash))
         return self._hash_list
-    #@property
-    def filename(self):
-        return self._filename
 
-    @study_count.setter
-    def study_count(self, new_value):
-        self._study_count = new_value
+    @property
+    def prev_hash(self):
+        position = self.hash_list.index(self.hash)
+        return self.hash_list[position-1] if position > 0 else None
+
+    @property
+    def next_hash(self):
+        position = self.hash_list.index(self.hash)
+        return self.hash_list[position+1] if position < len(self.hash_list)-1 else None
 
     def is_multipart(self):
-        return (len(self._hash_list) > 1)
+        return (len(self.hash_list) > 1)
     def is_complete(self):
-        return self._fulltext
+        return self.fulltext
 
 # TODO  - https://www.lingq.com/jobs/
 # TODO  - if i add a space between 2 words in a ja text, the indexes will now be off in the text_words file
@@ -296,7 +302,7 @@ def get_text_title(text):
     return title
 
 def process_and_save_text(text, text_type, title=None, append_to=None):
-    global glob_words_index_count
+    global _word_index_stale
 
     timestamp = datetime.now()
     new_hash = generate_hash(timestamp)
@@ -323,15 +329,9 @@ def process_and_save_text(text, text_type, title=None, append_to=None):
         "title": title if title else get_text_title(text)
     }
 
-    link_hash = prev_hash
-    while True:
-        mtdt = get_metadata(link_hash)
-        next_hash = mtdt.get("next_hash", None)
-        if next_hash:
-            link_hash = next_hash
-        else:
-            prev_hash = link_hash
-            break
+    if prev_hash:
+        # append after the last part of the chain
+        prev_hash = get_text_chain(prev_hash)[-1]
 
     if prev_hash:
         prev_metadata = get_metadata(prev_hash)
@@ -349,7 +349,10 @@ def process_and_save_text(text, text_type, title=None, append_to=None):
     if not parse_text(new_hash):
         return False
 
-    glob_words_index_count = 0
+    update_frequencies(new_hash)
+    get_frequency_table().save()
+
+    _word_index_stale = True
 
 def update_metadata(hash, metadata):
   """Updates the metadata file with information about the new text block."""
@@ -362,13 +365,192 @@ def update_metadata(hash, metadata):
 
   existing_metadata[hash] = metadata
 
-  with open(metadata_path, "w") as f:
-      json.dump(existing_metadata, f, indent=2)
+  save_metadata(existing_metadata, changed=[hash])
+
+# Process-wide metadata cache: the file is parsed once and only reloaded when
+# its mtime or size changes. Writers go through save_metadata() so the cache
+# always holds what is on disk.
+_metadata_cache = {"path": None, "stamp": None, "data": None}
+_sqlite_store = None
+_metadata_journal = None
+# get_metadata_store()'s result for (metadata_backend, metadata_path, metadata_db_path, json_format)
+_resolved_metadata_store = {"key": None, "store": None}
+
+def load_json(path):
+    return codec.load(path)
+
+def save_json(path, data):
+    codec.dump(data, path, compact=json_format != "pretty", default=_json_default)
+
+def _json_default(value):
+    if isinstance(value, IndexRecord):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def get_metadata_journal():
+    global _metadata_journal
+
+    journal_path = os.path.realpath(str(metadata_path))
+    compact = json_format != "pretty"
+    if (_metadata_journal is None or _metadata_journal.snapshot_path != journal_path
+        or _metadata_journal.compact_json != compact):
+        _metadata_journal = MetadataJournal(metadata_path, compact_json=compact)
+    return _metadata_journal
+
+def get_metadata_store():
+    """
+    Returns the store object of the active metadata backend (SQLite or
+    journal), or None when metadata.json is read and written directly.
+    """
+    global _sqlite_store
+
+    key = (metadata_backend, str(metadata_path), str(metadata_db_path), json_format)
+    if _resolved_metadata_store["key"] == key:
+        return _resolved_metadata_store["store"]
+    backend = metadata_backend
+    if backend == "auto":
+        if os.path.exists(metadata_db_path):
+            backend = "sqlite"
+        elif get_metadata_journal().has_journal():
+            backend = "journal"
+        else:
+            backend = "json"
+    store = None
+    if backend == "journal":
+        store = get_metadata_journal()
+    elif backend == "sqlite":
+        compact = json_format != "pretty"
+        if (_sqlite_store is None or _sqlite_store.db_path != str(metadata_db_path)
+            or _sqlite_store.compact_json != compact):
+            _sqlite_store = SqliteMetadataStore(metadata_db_path, compact_json=compact)
+        store = _sqlite_store
+    _resolved_metadata_store.update(key=key, store=store)
+    return store
+
+def load_metadata():
+    """Returns the full metadata dict, re-reading the file only if it changed."""
+    store = get_metadata_store()
+    path = getattr(store, "db_path", None) or str(metadata_path)
+    stamp = store.stamp() if store else _file_stamp(path)
+    if stamp is None:
+        raise FileNotFoundError(path)
+    if _metadata_cache["path"] != path or _metadata_cache["stamp"] != stamp:
+        if store:
+            data = store.get_all()
+        else:
+            data = load_json(path)
+        _metadata_cache.update(path=path, stamp=stamp, data=data)
+    return _metadata_cache["data"]
+
+def save_metadata(metadata, changed=None, removed=None):
+    """
+    Writes metadata to disk and refreshes the cache.
+
+    With the SQLite and journal backends only the entries listed in "changed"
+    and "removed" are written (all entries if "changed" is None). The JSON
+    backend always rewrites the whole file.
+    """
+    store = get_metadata_store()
+    if store:
+        if changed is None:
+            store.replace_all(metadata)
+        else:
+            store.put_many({h: metadata[h] for h in changed if h in metadata})
+        if removed:
+            store.delete_many(removed)
+        path = getattr(store, "db_path", None) or str(metadata_path)
+        stamp = store.stamp()
+    else:
+        path = str(metadata_path)
+        save_json(path, metadata)
+        stamp = _file_stamp(path)
+    _metadata_cache.update(path=path, stamp=stamp, data=metadata)
+    if changed is not None:
+        _update_chain_index(metadata, list(changed) + list(removed or []))
+
+def invalidate_metadata_cache():
+    """Forces the next get_metadata() call to re-read the file and pick the backend again."""
+    _metadata_cache.update(path=None, stamp=None, data=None)
+    _resolved_metadata_store.update(key=None, store=None)
+
+# Chain index for multipart texts: maps every hash to the ordered list of part
+# hashes of its chain (shared by all parts, so root and tail are list[0] and
+# list[-1]). Rebuilt when the cached metadata is reloaded, patched by writers.
+_chain_index = {"data": None, "chains": {}}
+
+def _walk_chain(metadata, hash):
+    root = hash
+    seen = {root}
+    while True:
+        prev_hash = metadata.get(root, {}).get("prev_hash", None)
+        if not prev_hash or prev_hash in seen:
+            break
+        root = prev_hash
+        seen.add(root)
+    parts = [root]
+    seen = {root}
+    while True:
+        next_hash = metadata.get(parts[-1], {}).get("next_hash", None)
+        if not next_hash or next_hash in seen:
+            break
+        parts.append(next_hash)
+        seen.add(next_hash)
+    return parts
+
+def _update_chain_index(metadata, hashes=None):
+    if hashes is None or _chain_index["data"] is not metadata:
+        chains = {}
+        hashes = list(metadata.keys())
+        _chain_index.update(data=metadata, chains=chains)
+    else:
+        chains = _chain_index["chains"]
+        # re-walk the old chains too, in case a link was removed
+        hashes = set(hashes)
+        for hash in list(hashes):
+            hashes.update(chains.get(hash, []))
+        for hash in hashes:
+            chains.pop(hash, None)
+    walked = set()
+    for hash in hashes:
+        if hash in walked or hash not in metadata:
+            continue
+        parts = _walk_chain(metadata, hash)
+        for part_hash in parts:
+            chains[part_hash] = parts
+        walked.update(parts)
+
+# hashes whose metadata was changed in memory but not written yet
+_dirty_metadata = set()
+
+def flush_metadata():
+    """Writes metadata entries that were changed in memory (eg. word counts)."""
+    if not _dirty_metadata:
+        return
+    metadata = get_metadata()
+    if metadata:
+        save_metadata(metadata, changed=list(_dirty_metadata))
+    _dirty_metadata.clear()
+
+def get_text_chain(hash):
+    """
+    Returns the ordered part hashes of the multipart text containing "hash"
+    (just [hash] for a single-part text).
+    """
+    metadata = load_metadata()
+    if _chain_index["data"] is not metadata:
+        _update_chain_index(metadata)
+    return _chain_index["chains"].get(hash, [hash])
 
 def get_metadata(hash=None):
     try:
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
+        metadata = load_metadata()
         if hash and hash in metadata:
             metadata = metadata[hash]
     except FileNotFoundError:
@@ -376,7 +558,44 @@ def get_metadata(hash=None):
         metadata = None
     return metadata
 
+def _count_text_file(filepath, known_digest, delims):
+    """
+    Fingerprints a text file and counts its words. The counts are None if the
+    content hash equals known_digest (the file was only touched).
+    """
+    stat = os.stat(filepath)
+    with open(filepath, "rb") as f:
+        content = f.read()
+    text_stat = {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(content).hexdigest()
+    }
+    if text_stat["sha256"] == known_digest:
+        return text_stat, None
+    words = content.decode("utf-8").split()
+    unique_words = set(word.lower().strip(delims) for word in words)
+    return text_stat, (len(words), len(unique_words))
+
+def _get_lang_code(language):
+    try:
+        langs_file = os.path.join(data_dir, "languages.json")
+        with open(langs_file, "r") as f:
+            languages = json.load(f)
+    except FileNotFoundError:
+        print("No languages.json file found.")
+        return None
+    if type(languages[language]) is dict:
+        return languages[language]["lang_code"]
+    return languages[language]
+
 def fix_metadata(hash_substring=None, quiet=False):
+    """
+    Fills in missing metadata of the current language's texts and recounts
+    num_words/num_uniq_words. Each text's fingerprint (mtime, size, content
+    hash) is kept in "text_stat", so unchanged texts are skipped; changed ones
+    are recounted in parallel.
+    """
     if not backup_metadata():
         print("Metadata cannot be saved since backup failed.")
         return False
@@ -397,6 +616,10 @@ def fix_metadata(hash_substring=None, quiet=False):
         return
 
     updated_metadata = {}
+    changed = []
+    removed = []
+    to_count = {}
+    lang_code = False  # not looked up yet
     for hash, metadata in existing_metadata.items():
         if ((full_hash and linked_texts and hash not in linked_texts)
             or (full_hash and not linked_texts and full_hash != hash)
@@ -404,60 +627,122 @@ def fix_metadata(hash_substring=None, quiet=False):
             updated_metadata[hash] = metadata
             continue
         filepath = os.path.join(texts_dir, current_language, hash + '.txt')
-        if os.path.exists(filepath):
-            # Check and update missing "timestamp"
-            if "timestamp" not in metadata:
-                create_tm = datetime.fromtimestamp(os.path.getctime(filepath))
-                metadata["timestamp"] = create_tm.strftime("%Y-%m-%d %H:%M:%S")
-                print(f"Info: Timestamp for file '{filepath}' set.")
-
-            # Check and update missing "num_words"
-            with open(filepath, "r", encoding="utf-8") as f:
-                text = f.read()
-            words = text.split()
-            metadata["num_words"] = len(words)
-            unique_words = set(normalize_word(word.lower()) for word in words)
-            metadata["num_uniq_words"] = len(unique_words)
-
-            if "lang_code" not in metadata:
-                lang_code = None
-                try:
-                    langs_file = os.path.join(data_dir, "languages.json")
-                    with open(langs_file, "r") as f:
-                        languages = json.load(f)
-                    if type(languages[current_language]) is dict:
-                        lang_data = languages[current_language]
-                        lang_code = lang_data["lang_code"]
-                    else:
-                        lang_code = languages[current_language]
-                    metadata["lang_code"] = lang_code
-                except FileNotFoundError:
-                    print("No languages.json file found.")
-
-            if "type" not in metadata:
-                # set default text type to 'normal' as opposed to 'wordlist'
-                metadata["type"] = "normal"
-
-            updated_metadata[hash] = metadata
-
-        else:
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
             # if we've manually removed the text, don't keep its metadata
             print(f"text file '{filepath}' not found. Removing metadata.")
+            removed.append(hash)
+            continue
 
-    with open(metadata_path, "w") as f:
-        json.dump(updated_metadata, f, indent=2)
+        updated_metadata[hash] = metadata
+        entry_changed = False
+        # Check and update missing "timestamp"
+        if "timestamp" not in metadata:
+            create_tm = datetime.fromtimestamp(stat.st_ctime)
+            metadata["timestamp"] = create_tm.strftime("%Y-%m-%d %H:%M:%S")
+            print(f"Info: Timestamp for file '{filepath}' set.")
+            entry_changed = True
+
+        if "lang_code" not in metadata:
+            if lang_code is False:
+                lang_code = _get_lang_code(current_language)
+            if lang_code is not None:
+                metadata["lang_code"] = lang_code
+                entry_changed = True
+
+        if "type" not in metadata:
+            # set default text type to 'normal' as opposed to 'wordlist'
+            metadata["type"] = "normal"
+            entry_changed = True
+
+        text_stat = metadata.get("text_stat", {})
+        if ("num_words" not in metadata or "num_uniq_words" not in metadata
+            or text_stat.get("mtime") != stat.st_mtime_ns or text_stat.get("size") != stat.st_size):
+            to_count[hash] = filepath
+        elif entry_changed:
+            changed.append(hash)
+
+    if to_count:
+        hashes = list(to_count)
+        # an unchanged text is only skipped if its counts are there too (an
+        # entry restored from an older backup or edited by hand may lack them)
+        digests = [
+            existing_metadata[h].get("text_stat", {}).get("sha256")
+            if "num_words" in existing_metadata[h] and "num_uniq_words" in existing_metadata[h] else None
+            for h in hashes
+        ]
+        delims = repeat(word_delims)
+        if len(hashes) > 16:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(_count_text_file, to_count.values(), digests, delims, chunksize=16))
+        else:
+            # starting worker processes costs more than counting a few texts
+            results = list(map(_count_text_file, to_count.values(), digests, delims))
+        for hash, (text_stat, counts) in zip(hashes, results):
+            metadata = existing_metadata[hash]
+            metadata["text_stat"] = text_stat
+            if counts is not None:
+                metadata["num_words"], metadata["num_uniq_words"] = counts
+            changed.append(hash)
+
+    if changed or removed:
+        save_metadata(updated_metadata, changed=changed, removed=removed)
+    if removed:
+        # removed texts stop counting in "freq" and frequent_rank
+        table = get_frequency_table()
+        for hash in removed:
+            table.remove_text(hash)
+        table.save()
 
     if not quiet:
         print("Metadata updated successfully.")
 
+def metadata_db(action):
+    """
+    "import" migrates metadata.json into metadata.db (which makes SQLite the
+    active backend when metadata_backend is "auto"); "export" writes
+    metadata.db back out to metadata.json.
+    """
+    if action == "import":
+        if not os.path.exists(metadata_path):
+            print(f"No metadata file found at '{metadata_path}'.")
+            return False
+        if os.path.exists(metadata_db_path):
+            confirmation = input(f"'{metadata_db_path}' already exists. Overwrite it? (y/n): ")
+            if confirmation.lower() != "y":
+                print(f"{Fore.RED}Import aborted.{Style.RESET_ALL}")
+                return False
+        if get_metadata_journal().has_journal():
+            get_metadata_journal().compact()
+        store = get_metadata_store()
+        if not isinstance(store, SqliteMetadataStore):
+            store = SqliteMetadataStore(metadata_db_path, compact_json=json_format != "pretty")
+        num_texts = store.import_json(metadata_path)
+        store.close()
+        invalidate_metadata_cache()
+        print(f"Imported metadata for {num_texts} texts into '{metadata_db_path}'.")
+    elif action == "export":
+        if not os.path.exists(metadata_db_path):
+            print(f"No metadata database found at '{metadata_db_path}'.")
+            return False
+        store = get_metadata_store()
+        if not isinstance(store, SqliteMetadataStore):
+            store = SqliteMetadataStore(metadata_db_path, compact_json=json_format != "pretty")
+        num_texts = store.export_json(metadata_path)
+        print(f"Exported metadata for {num_texts} texts to '{metadata_path}'.")
+    else:
+        print("Valid arguments are: import, export")
+        return False
+    return True
+
 def list_metadata(hash_substring=None):
     """
     Lists the metadata for all text blocks.
     """
     full_hash = None
     if hash_substring:
-        ensure_text_hashes_populated()
-        full_hash = [h for h in text_hashes if h.startswith(hash_substring)]
+        full_hash = find_hashes(hash_substring)
 
         if len(full_hash) == 0:
             print(f"No text found with hash substring '{hash_substring}'.")
@@ -501,160 +786,320 @@ def list_langs():
     lang_input = input("Enter a valid number: ")
     return langs[int(lang_input)-1][0] if lang_input in valid_ints else "_invalid_lang_"
 
-def list_texts(filter=None, limit=None):
+def count_text_words(parsed_text):
+    """Counts the completion counters that "list" shows for a text_words dict."""
+    counts = {"translated": 0, "untranslated": 0, "alt_filled": 0, "alt_empty": 0, "skipped": 0}
+    for word_data in parsed_text.values():
+        for tr_data in word_data:
+            if tr_data.get("skip", False):
+                counts["skipped"] += 1
+                continue
+            if tr_data.get("translation", "") != "":
+                counts["translated"] += 1
+            else:
+                counts["untranslated"] += 1
+            if tr_data.get("alt_representation", "") != "":
+                counts["alt_filled"] += 1
+            else:
+                counts["alt_empty"] += 1
+    return counts
+
+def _count_text_words_file(text_words_file):
+    try:
+        return count_text_words(load_json(text_words_file))
+    except FileNotFoundError:
+        return None
+
+def set_word_counts(hash, parsed_text, flush=True):
+    """
+    Stores the completion counters of a text in its metadata. With flush=False
+    the entry is only updated in memory until flush_metadata() is called.
+    """
+    metadata = get_metadata()
+    if not metadata or hash not in metadata:
+        return
+    metadata[hash]["word_counts"] = count_text_words(parsed_text)
+    _dirty_metadata.add(hash)
+    if flush:
+        flush_metadata()
+
+def get_word_counts(hash):
+    """
+    Returns the stored completion counters of a text, counting (and storing)
+    them from its text_words file if they are missing. None if the file is missing.
+    """
+    metadata = get_metadata()
+    counts = metadata.get(hash, {}).get("word_counts", None)
+    if counts is None:
+        text_words_file = os.path.join(text_words_dir, current_language, f"{hash}.json")
+        counts = _count_text_words_file(text_words_file)
+        if counts is not None and hash in metadata:
+            metadata[hash]["word_counts"] = counts
+            _dirty_metadata.add(hash)
+    return counts
+
+def recount_word_counts():
+    """Rebuilds the completion counters of all texts of the current language in parallel."""
+    metadata = get_metadata()
+    if not metadata:
+        return False
+    hashes = [h for h, m in metadata.items() if m["language"].lower() == current_language]
+    text_words_files = [os.path.join(text_words_dir, current_language, f"{h}.json") for h in hashes]
+    with ProcessPoolExecutor() as executor:
+        all_counts = list(executor.map(_count_text_words_file, text_words_files, chunksize=16))
+    for hash, counts in zip(hashes, all_counts):
+        if counts is not None:
+            metadata[hash]["word_counts"] = counts
+            _dirty_metadata.add(hash)
+    flush_metadata()
+    print(f"Recounted words for {len(hashes)} texts.")
+    return True
+
+def _text_percent_complete(hash):
+    """Returns the translated percentage over all parts of a text."""
+    non_empty_translations = 0
+    empty_translations = 0
+    for part_hash in get_text_chain(hash):
+        counts = get_word_counts(part_hash)
+        if counts is None:
+            return 0
+        non_empty_translations += counts["translated"]
+        empty_translations += counts["untranslated"]
+        if alt_representation_required:
+            non_empty_translations += counts["alt_filled"]
+            empty_translations += counts["alt_empty"]
+    total_words = non_empty_translations + empty_translations
+    if total_words == 0:
+        return 0
+    return round(100*non_empty_translations/total_words)
+
+list_sort_keys = {
+    "date": lambda row: row["last_study_date"],
+    "count": lambda row: row["study_count"],
+    "percent": lambda row: row["percent_complete"]
+}
+
+def query_texts(filter=None, label=None, tag=None, percent=None, age=None, sort=None, limit=None):
+    """
+    Yields a row for every text of the current language that matches the query.
+
+    The predicates on metadata fields are checked first; the completion percent
+    (which reads the word counters of every part) is only computed for texts
+    that pass them. Without "sort", rows are yielded as soon as they qualify
+    and the scan stops after "limit" rows.
 
-    # overkill?
-    #fix_metadata(quiet=True)
+    Labelled texts come first and collapse into one row per label, unless
+    "label" is given, in which case only that label's texts are listed.
 
+    :param filter: "a" (all), "f" (complete full texts) or "nf" (not full texts)
+    :param percent: (min, max) completion percent, inclusive
+    :param age: only texts not studied in the last "age" days
+    :param sort: key of list_sort_keys, prefixed with "-" for descending order
+    """
     existing_metadata = get_metadata()
     if not existing_metadata:
         return
+    cutoff = None
+    if age is not None:
+        cutoff = (datetime.now() - timedelta(days=age)).strftime("%Y-%m-%d %H:%M:%S")
+    need_percent = filter == "f" or percent is not None or (sort and sort.lstrip("-") == "percent")
+    short_hash_len = get_hash_index(current_language)["prefix_len"]
+
+    def candidates():
+        for labelled in (True, False):
+            for hash, metadata in existing_metadata.items():
+                if bool(metadata.get("label", None)) != labelled:
+                    continue
+                if not metadata["language"].lower().startswith(current_language):
+                    continue
+                # do not include texts that are subsequent parts of an initial text
+                if metadata.get("prev_hash", "") != "":
+                    continue
+                if metadata.get("hidden", False):
+                    continue
+                if label and metadata.get("label", None) != label:
+                    continue
+                if tag and metadata.get("tag", None) != tag:
+                    continue
+                if filter == "f" and not metadata.get("fulltext", None):
+                    continue
+                if filter == "nf" and metadata.get("fulltext", None):
+                    continue
+                if cutoff and (metadata.get("last_study_date") or "") > cutoff:
+                    continue
+                yield hash, metadata
 
-    hash_label = None
-    if filter and filter not in ["a", "f", "nf"]:
-        hash_label = get_full_hash(filter)
-    if filter and (filter not in ["a", "f", "nf"] and hash_label not in existing_metadata):
-        print("Invalid argument. Valid arguments are: a, f, nf, or the hash of a text.")
-        return
+    def rows():
+        seen_labels = set()
+        for hash, metadata in candidates():
+            row_label = None if label else metadata.get("label", None)
+            if row_label in seen_labels:
+                continue
+            percent_complete = None
+            if need_percent or not row_label:
+                percent_complete = _text_percent_complete(hash)
+            if filter == "f" and percent_complete != 100:
+                continue
+            if percent and not percent[0] <= percent_complete <= percent[1]:
+                continue
+            if row_label:
+                seen_labels.add(row_label)
+            yield {
+                "percent_complete": percent_complete,
+                "fulltext": metadata.get("fulltext", None),
+                "last_study_date": metadata.get("last_study_date") or "",
+                "study_count": metadata.get("study_count", 0),
+                "url": metadata.get("url", None),
+                "short_hash": hash[:short_hash_len],
+                "tag": metadata.get("tag", "----"),
+                "label": row_label,
+                "title": metadata.get("title", "No Title").strip()
+            }
 
-    show_label = None
-    if hash_label in existing_metadata:
-        show_label = existing_metadata[hash_label].get("label", None)
-        filter = None  # reset filter to None if we found a hash label
+    if sort:
+        key = list_sort_keys[sort.lstrip("-")]
+        sorted_rows = sorted(rows(), key=key, reverse=sort.startswith("-"))
+        yield from sorted_rows[:limit]
+    else:
+        yield from islice(rows(), limit)
 
-    texts = {}
-    texts_with_label = {}
-    for hash, metadata in existing_metadata.items():
-        lang = metadata["language"].lower()
-        if not lang.startswith(current_language):
-            continue
-        # do not include texts that are subsequent parts of an initial text
-        if metadata.get("prev_hash", "") != "":
-            continue
-        if metadata.get("hidden", False):
-            continue
-        if show_label and metadata.get("label", None) != show_label:
-            continue
-        if metadata.get("label", None):
-            texts_with_label[hash] = metadata
-        else:
-            texts[hash] = metadata
-    texts_with_label.update(texts)
-    texts = texts_with_label
+def print_list_row(row):
+    if row["label"]:
+        print(f'    |  |          | |{row["short_hash"]}|    |{Fore.GREEN + row["label"] + Style.RESET_ALL}')
+        return
+    percent_complete = row["percent_complete"]
+    percent = f"{'{:3d}'.format(percent_complete)}%"
+    if percent_complete <= 33:
+        percent = Fore.RED + percent + Style.RESET_ALL
+    elif percent_complete <= 66:
+        percent = Fore.YELLOW + percent + Style.RESET_ALL
+    else:
+        percent = Fore.GREEN + percent + Style.RESET_ALL
+    fulltext = row["fulltext"]
+    if fulltext is None:
+        fulltext = '--'
+    else:
+        fulltext = "FT" if fulltext else f"{Fore.RED}pt{Style.RESET_ALL}"
+    last_study = (row["last_study_date"] or "____-__-__")[:10]
+    url = "u" if row["url"] else "-"
+    tag = f"{'{:>4}'.format(row['tag'])}"
+    print(f'{percent}|{fulltext}|{last_study}|{url}|{row["short_hash"]}|{tag}|{row["title"]}')
 
-    print_texts = []
-    labels = []
-    for hash, metadata in texts.items():
+def parse_list_args(params):
+    """
+    Parses the arguments of "list" into keyword arguments for list_texts():
+        list [a|f|nf|<hash>] [limit] [label:<label>] [tag:<tag>]
+             [pct:<min>-<max>] [age:<days>] [sort:[-]date|count|percent]
+    A hash lists the texts that share that text's label.
+    Returns None if an argument is invalid.
+    """
+    query = {}
+    positional = []
+    for param in params:
+        key, sep, value = param.partition(":")
+        if not sep:
+            positional.append(param)
+            continue
         try:
-          non_empty_translations = 0
-          empty_translations = 0
-          skipped = 0
-          orig_hash = hash
-          while True:
-            text_words_file = os.path.join(text_words_dir, current_language, f"{hash}.json")
-            with open(text_words_file, 'r', encoding='utf-8') as f:
-                parsed_text = json.load(f)
-            for word_data in parsed_text.values():
-                for tr_data in word_data:
-                    if tr_data.get("skip", False):
-                        skipped += 1
-                        continue
-                    if tr_data.get("translation", "") != "":
-                        non_empty_translations += 1
-                    else:
-                        empty_translations += 1
-                    if alt_representation_required:
-                        if tr_data.get("alt_representation", "") != "":
-                            non_empty_translations += 1
-                        else:
-                            empty_translations += 1
-            mtdt = get_metadata(hash)
-            next_hash = mtdt.get("next_hash", None)
-            if next_hash:
-                hash = next_hash
+            if key in ("label", "tag"):
+                query[key] = value
+            elif key == "pct":
+                low, _, high = value.partition("-")
+                query["percent"] = (int(low or 0), int(high or 100))
+            elif key == "age":
+                query["age"] = int(value)
+            elif key == "sort" and value.lstrip("-") in list_sort_keys:
+                query["sort"] = value
             else:
-                break
-          total_words = non_empty_translations + empty_translations
-          percent_complete = 0
-          if total_words > 0:
-              percent_complete = round(100*non_empty_translations/total_words)
-        except FileNotFoundError:
-            percent_complete = 0
-
-        short_hash = f"{orig_hash[:6]}"
-        percent = f"{'{:3d}'.format(percent_complete)}%"
-        if percent_complete <= 33:
-            percent = Fore.RED + percent + Style.RESET_ALL
-        elif percent_complete <= 66:
-            percent = Fore.YELLOW + percent + Style.RESET_ALL
-        else:
-            percent = Fore.GREEN + percent + Style.RESET_ALL
-        title = metadata.get('title', 'No Title').strip()
-        url = "u" if metadata.get('url', None) else "-"
-        fulltext = metadata.get('fulltext', None)
-        if fulltext is None:
-            fulltext = '--'
-        else:
-            fulltext = "FT" if fulltext else f"{Fore.RED}pt{Style.RESET_ALL}"
-        last_study = f"{metadata.get('last_study_date', '____-__-__')[:10]}"
-        tag = metadata.get('tag', "----")
-        tag = f"{'{:>4}'.format(tag)}"
-        label = metadata.get('label', None)
-        hide_text = False
-        if not show_label:
-            if label and label not in labels:
-                labels.append(label)
-            elif label in labels:
-                hide_text = True
-        if hide_text:
-            continue
-        if (not filter or filter == "a"
-            or (filter == "f" and percent_complete == 100 and fulltext == "FT")
-            or (filter == "nf" and fulltext != "FT")):
+                print(f"Invalid argument '{param}'.")
+                return None
+        except ValueError:
+            print(f"Invalid argument '{param}'.")
+            return None
+    if len(positional) >= 1:
+        query["filter"] = positional[0]
+    if len(positional) >= 2:
+        try:
+            query["limit"] = int(positional[1])
+        except ValueError:
+            pass
+    return query
 
-            print_texts.append({
-                "percent": percent,
-                "percent_complete": percent_complete,
-                "fulltext": fulltext,
-                "last_study": last_study,
-                "url": url,
-                "short_hash": short_hash,
-                "tag": tag,
-                "label": None if show_label else label,
-                "title": title
-            })
-    if show_label:
-        print(f"Label: {show_label}")
+def list_texts(filter=None, limit=None, **query):
+    """Prints the texts matched by query_texts(); limit defaults to 1000."""
+
+    existing_metadata = get_metadata()
+    if not existing_metadata:
+        return
+
+    if filter and filter not in ["a", "f", "nf"]:
+        hash_label = get_full_hash(filter)
+        if hash_label not in existing_metadata:
+            print("Invalid argument. Valid arguments are: a, f, nf, or the hash of a text.")
+            return
+        # list the texts with the same label as the given text
+        query["label"] = existing_metadata[hash_label].get("label", None)
+        filter = None
+
+    if query.get("label", None):
+        print(f"Label: {query['label']}")
     if not limit:
         limit = 1000  # default limit if not specified
-    ctr = 0
-    for text in print_texts:
-        if ctr >= limit:
-            break
-        ctr += 1
-        print(f'{"    " if text["label"] else text["percent"]}', end="|")
-        print(f'{"  " if text["label"] else text["fulltext"]}', end="|")
-        print(f'{"          " if text["label"] else text["last_study"]}', end="|")
-        print(f'{" " if text["label"] else text["url"]}', end="|")
-        print(f'{text["short_hash"]}', end="|")
-        print(f'{"    " if text["label"] else text["tag"]}', end="|")
-        print(f'{Fore.GREEN + text["label"] + Style.RESET_ALL if text["label"] else text["title"]}')
+    for row in query_texts(filter=filter, limit=limit, **query):
+        print_list_row(row)
     print()
 
-def ensure_text_hashes_populated():
+    # store any counters that had to be computed
+    flush_metadata()
+
+# Sorted per-language hash lists, so a short-hash lookup is a bisect. Rebuilt
+# when the cached metadata is reloaded or texts are added or removed.
+_hash_index = {"data": None, "size": None, "langs": {}}
+
+# "a" and "f" are "list" filters too, so printed hashes are never shorter than
+# this and can always be passed back in
+min_short_hash_len = 2
+
+def _unique_prefix_len(sorted_hashes):
+    """Returns the shortest prefix length (at least min_short_hash_len) that tells all sorted_hashes apart."""
+    prefix_len = min_short_hash_len
+    for prev_hash, hash in zip(sorted_hashes, sorted_hashes[1:]):
+        common = 0
+        for a, b in zip(prev_hash, hash):
+            if a != b:
+                break
+            common += 1
+        prefix_len = max(prefix_len, common + 1)
+    return prefix_len
+
+def get_hash_index(language):
     """
-    Ensures that the global 'text_hashes' set is populated.
+    Returns {"hashes": sorted hashes, "prefix_len": shortest unambiguous
+    prefix length} for the texts of a language.
     """
-    global text_hashes
-
-    text_hashes = set()  # Initialize text_hashes
-    existing_metadata = get_metadata()
-    if not existing_metadata:
-        return False
-    for hash, metadata in existing_metadata.items():
-        if current_language != metadata["language"].lower():
-            continue
-        text_hashes.add(hash)
+    metadata = get_metadata()
+    if not metadata:
+        return {"hashes": [], "prefix_len": min_short_hash_len}
+    if _hash_index["data"] is not metadata or _hash_index["size"] != len(metadata):
+        by_lang = {}
+        for hash, text_metadata in metadata.items():
+            by_lang.setdefault(text_metadata["language"].lower(), []).append(hash)
+        langs = {}
+        for lang, hashes in by_lang.items():
+            hashes.sort()
+            langs[lang] = {"hashes": hashes, "prefix_len": _unique_prefix_len(hashes)}
+        _hash_index.update(data=metadata, size=len(metadata), langs=langs)
+    return _hash_index["langs"].get(language, {"hashes": [], "prefix_len": min_short_hash_len})
+
+def find_hashes(hash_substring, language=None):
+    """Returns the hashes of a language (default: current) starting with hash_substring."""
+    hashes = get_hash_index(language or current_language)["hashes"]
+    matches = []
+    i = bisect_left(hashes, hash_substring)
+    while i < len(hashes) and hashes[i].startswith(hash_substring):
+        matches.append(hashes[i])
+        i += 1
+    return matches
 
 def read_text(hash_substring):
     pass
@@ -663,9 +1108,7 @@ def show_text(hash_substring):
     """
     Displays the text content based on the provided hash substring.
     """
-    ensure_text_hashes_populated()
-
-    matching_hashes = [h for h in text_hashes if h.startswith(hash_substring)]
+    matching_hashes = find_hashes(hash_substring)
 
     if len(matching_hashes) == 0:
         print(f"No text found with hash substring '{hash_substring}'.")
@@ -699,13 +1142,31 @@ def normalize_word(word):
 def normalize_sentence(sentence):
     return sentence.strip()
 
+_backup_store = None
+
+def get_backup_store():
+    """Returns the BackupStore, keeping its catalog loaded between calls."""
+    global _backup_store
+    if _backup_store is None or _backup_store.root_dir != str(backup_store_dir):
+        _backup_store = BackupStore(backup_store_dir)
+    return _backup_store
+
 def backup_metadata():
     try:
-        # Create a backup of the existing metadata
-        bkp_fname = f"metadata_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
-        backup_filepath = os.path.join(backups_dir, bkp_fname)
-        os.makedirs(backups_dir, exist_ok=True)
-        shutil.copy("metadata.json", backup_filepath)
+        # Create a backup of the existing metadata; unchanged content is not stored again
+        store = get_metadata_store()
+        if isinstance(store, MetadataJournal):
+            # fold the journal in so the snapshot copy is complete
+            store.compact()
+            store = None
+        if store:
+            os.makedirs(backups_dir, exist_ok=True)
+            db_copy = os.path.join(backups_dir, "metadata.db.tmp")
+            store.backup_to(db_copy)
+            get_backup_store().backup("metadata.db", db_copy)
+            os.remove(db_copy)
+        else:
+            get_backup_store().backup("metadata.json", metadata_path)
         return True
     except (PermissionError, FileNotFoundError, OSError) as e:
         print(f"Error creating backup: {e}")
@@ -713,12 +1174,8 @@ def backup_metadata():
 
 def backup_text_words(hash, word_filepath):
     try:
-        # Create a backup of the existing word_data
-        bkp_fname = f"{hash}_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
-        backup_filepath = os.path.join(text_words_dir, "backups", bkp_fname)
-        backup_path = os.path.join(text_words_dir, "backups")
-        os.makedirs(backup_path, exist_ok=True)
-        shutil.copy(word_filepath, backup_filepath)
+        # Create a backup of the existing word_data; unchanged content is not stored again
+        get_backup_store().backup(f"text_words/{hash}.json", word_filepath)
         return True
     except (PermissionError, FileNotFoundError, OSError) as e:
         print(f"Error creating backup: {e}")
@@ -742,8 +1199,7 @@ def create_sentences(hash, alt=True):
     text_sents_file = os.path.join(text_sents_dir, current_language, f"{hash}.json")
     text_sents_list = None
     try:
-        with open(text_sents_file, 'r', encoding='utf-8') as f:
-            text_sents_list = json.load(f)
+        text_sents_list = load_json(text_sents_file)
     except FileNotFoundError:
         err_msg = "Error in {}: {} not found."
         print(err_msg.format("_".join(["create","sentences"]), text_sents_file))
@@ -751,8 +1207,7 @@ def create_sentences(hash, alt=True):
 
     text_words_file = os.path.join(text_words_dir, current_language, f"{hash}.json")
     try:
-        with open(text_words_file, 'r', encoding='utf-8') as f:
-            text_words_json = json.load(f)
+        text_words_json = load_json(text_words_file)
     except FileNotFoundError:
         err_msg = "Error in {}: {} not found."
         print(err_msg.format("_".join(["create","sentences"]), text_words_file))
@@ -976,85 +1431,142 @@ def format_sentences(sentence, native_sent, spec_alt_sent):
 
     return sentence, native_sent, spec_alt_sent
 
+def _queue_candidates(hash_list=None, exclude_filters={}, include_filters={}):
+    """
+    Yields (word, index record) for every study/edit candidate of
+    GLOBAL_WORD_INDEX in index order. Records with a value in exclude_filters
+    are left out; include_filters maps secondary index names ("types",
+    "tags") to lists of keys, and only records filed under one of the keys of
+    every given index are yielded. These are looked up in the secondary
+    indexes instead of walking the whole word index.
+    """
+    included = _included_postings(include_filters)
+    word_records = GLOBAL_WORD_INDEX.items()
+    if included is not None:
+        word_records = [(word, GLOBAL_WORD_INDEX.get(word, [])) for word in sorted({p[0] for p in included})]
+    for word, index_records in word_records:
+        for index_record in index_records:
+            if hash_list and index_record["hash"] not in hash_list:
+                continue
+            if _is_queue_candidate(word, index_record, included, exclude_filters):
+                yield word, index_record
+
+def _included_postings(include_filters):
+    """Returns the set of (word, hash, list_index) passing include_filters, or None if there are none."""
+    included = None
+    secondary = _word_index_manifest["secondary"]
+    for name, keys in include_filters.items():
+        postings = set()
+        for key in keys:
+            postings.update(_iter_postings(secondary.get(name, {}).get(key, [])))
+        included = postings if included is None else included & postings
+    return included
+
+def _is_queue_candidate(word, index_record, included, exclude_filters):
+    if "word_ptr" in index_record:
+        return False
+    if included is not None and (word, index_record["hash"], index_record.get("list_index")) not in included:
+        return False
+    for key, value in exclude_filters.items():
+        if _index_value(index_record, word, key) == value:
+            return False
+    return True
+
+def iter_word_data(
+        hash_list=None,
+        randomize=False,
+        translated_only=False,
+        include_filters={},
+        block_size=8):
+    """
+    Streaming version of get_word_data(): yields the same candidates as
+    (word, hash, list_index, index, sent_inx), text by text, from the queue
+    rows of each text (see _text_queue_rows()), so the first ones are ready
+    without going through the whole index and the index records aren't read
+    at all.
+    translated_only leaves out words without a translation (like
+    exclude_filters={"translation": ""}). Without randomize texts come in
+    hash order and their words in sentence order (like alt=True). With
+    randomize the texts are shuffled and the words of every block of
+    block_size texts are shuffled together.
+    """
+    included = _included_postings(include_filters)
+    files = _word_index_manifest["files"]
+    text_hashes = [h for h in (hash_list or files) if h in files]
+    if included is not None:
+        included_hashes = {p[1] for p in included}
+        text_hashes = [h for h in text_hashes if h in included_hashes]
+    if randomize:
+        random.shuffle(text_hashes)
+    else:
+        text_hashes.sort()
+        block_size = 1
+
+    for start in range(0, len(text_hashes), block_size):
+        block = []
+        for text_hash in text_hashes[start:start + block_size]:
+            for word, list_index, index, sent_inx, translated in _text_queue_rows(text_hash, files[text_hash]):
+                if translated_only and not translated:
+                    continue
+                if included is not None and (word, text_hash, list_index) not in included:
+                    continue
+                block.append((word, text_hash, list_index, index, sent_inx))
+        if randomize:
+            random.shuffle(block)
+        else:
+            block.sort(key=lambda c: (c[4], c[3]))
+        yield from block
+
 def get_word_data(
         hash_list=None,
         randomize=False,
         alt=False,
-        exclude_filters={}):
+        exclude_filters={},
+        include_filters={}):
+    """
+    Returns the study/edit queue of _queue_candidates() as parallel columns:
+    {"all_words": [...], "all_hashes": [...], "all_list_inxs": array, "all_word_inxs": array,
+    "all_sent_inxs": array}. The index columns are array('i') (sent_inx -1
+    where a meaning has none) and all_hashes refers to one string per text.
+    With alt the queue is ordered by text, sentence and word index; with
+    randomize it is shuffled. Both are done on a permutation of positions.
+    """
     # "alt" has been set to True in each place this function is called.
     # writing this comment on 2025-07-28
     # after some time of no issues, make the alt functionality the default one.
 
-    global GLOBAL_WORD_INDEX
-
-    data_delimiter = "__suhs__"
-    word_hash_inx_list = []
-    alt_list = []
-    while True:
-        for word, index_records in GLOBAL_WORD_INDEX.items():
-            for index_record in index_records:
-                if hash_list and index_record["hash"] not in hash_list:
-                    continue
-                if "word_ptr" in index_record:
-                    continue
-                if exclude_filters:
-                    exclude = False
-                    for excl_key, excl_value in exclude_filters.items():
-                        # TODO: create unabbrev function?
-                        index_value = index_record.get(excl_key, "")
-                        if index_value == "_w_":
-                            index_value = word
-                        elif index_value == "_a_":
-                            index_value = index_record.get("alt_representation", "")
-                        elif index_value == "_t_":
-                            index_value = index_record.get("translation", "")
-                        if index_value == excl_value:
-                            exclude = True
-                    if exclude:
-                        continue
-                new_item = data_delimiter.join([
-                    word,
-                    index_record["hash"],
-                    str(index_record["list_index"]),
-                    str(index_record["index"]),
-                    str(index_record["sent_inx"])
-                ])
-                word_hash_inx_list.append(new_item)
-                alt_item = [
-                    word,
-                    index_record["hash"],
-                    index_record["list_index"],
-                    index_record["index"],
-                    index_record["sent_inx"]
-                ]
-                alt_list.append(alt_item)
-        sorted_alt_list = sorted(alt_list, key=lambda x: (x[1], x[4], x[3]))
-        if alt:
-            word_hash_inx_list = [data_delimiter.join([x[0], x[1], str(x[2]), str(x[3]), str(x[4])]) for x in sorted_alt_list]
-        break
+    hash_ids = {}
+    words = []
+    hash_col = array("i")
+    list_col = array("i")
+    word_col = array("i")
+    sent_col = array("i")
+    for word, index_record in _queue_candidates(hash_list, exclude_filters, include_filters):
+        words.append(word)
+        hash_col.append(hash_ids.setdefault(index_record["hash"], len(hash_ids)))
+        list_col.append(index_record["list_index"])
+        word_col.append(index_record["index"])
+        sent_inx = index_record["sent_inx"]
+        sent_col.append(-1 if sent_inx == "" else sent_inx)
+
+    hashes = list(hash_ids)
+    order = list(range(len(words)))
+    if alt:
+        hash_ranks = array("i", [0]*len(hashes))
+        for rank, hash_id in enumerate(sorted(range(len(hashes)), key=hashes.__getitem__)):
+            hash_ranks[hash_id] = rank
+        order.sort(key=lambda i: (hash_ranks[hash_col[i]], sent_col[i], word_col[i]))
     if randomize:
-        random.shuffle(word_hash_inx_list)
-    all_words = []
-    all_hashes = []
-    all_list_inxs = []
-    all_word_inxs = []
-    all_sent_inxs = []
-    for item in word_hash_inx_list:
-        word, hash, list_index, word_index, sent_index = item.split(data_delimiter)
-        all_words.append(word)
-        all_hashes.append(hash)
-        all_list_inxs.append(int(list_index))
-        all_word_inxs.append(int(word_index))
-        all_sent_inxs.append(int(sent_index))
+        random.shuffle(order)
+
     all_words_dict = {
-        "all_words": all_words,
-        "all_hashes": all_hashes,
-        "all_list_inxs": all_list_inxs,
-        "all_word_inxs": all_word_inxs,
-        "all_sent_inxs": all_sent_inxs
+        "all_words": [words[i] for i in order],
+        "all_hashes": [hashes[hash_col[i]] for i in order],
+        "all_list_inxs": array("i", (list_col[i] for i in order)),
+        "all_word_inxs": array("i", (word_col[i] for i in order)),
+        "all_sent_inxs": array("i", (sent_col[i] for i in order))
     }
     return all_words_dict
-    #return all_words, all_hashes, all_list_inxs, all_word_inxs, all_sent_inxs
 
 def get_sentences(base_index, text_sents_list, offset=1, prev_hash=None, next_hash=None):
 
@@ -1069,8 +1581,7 @@ def get_sentences(base_index, text_sents_list, offset=1, prev_hash=None, next_ha
             if prev_hash:
                 # open sentence file for the previous text
                 prev_text_sents_file = os.path.join(text_sents_dir, current_language, f"{prev_hash}.json")
-                with open(prev_text_sents_file, 'r', encoding='utf-8') as f:
-                    prev_text_sents_list = json.load(f)
+                prev_text_sents_list = load_json(prev_text_sents_file)
                 # add the last sentences from the previous text.
                 prev_sents = prev_text_sents_list[-(abs(offset) - len(context_sents)):]
                 prev_sents = [s for s in reversed(prev_sents)]
@@ -1083,8 +1594,7 @@ def get_sentences(base_index, text_sents_list, offset=1, prev_hash=None, next_ha
             if next_hash:
                 # open sentence file for the next text
                 next_text_sents_file = os.path.join(text_sents_dir, current_language, f"{next_hash}.json")
-                with open(next_text_sents_file, 'r', encoding='utf-8') as f:
-                    next_text_sents_list = json.load(f)
+                next_text_sents_list = load_json(next_text_sents_file)
                 # add the first sentences from the next text.
                 context_sents.extend(next_text_sents_list[:(offset - len(context_sents))])
             else:
@@ -1254,7 +1764,7 @@ def pyperclip_copy(text):
 
 def edit(edit_text=None, randomize=False):
 
-    global GLOBAL_WORD_INDEX, glob_words_index_lang, glob_words_index_count
+    global GLOBAL_WORD_INDEX, glob_words_index_lang
     global current_hash
 
     rule_mgr = RulesManager(rules_dir=rules_dir)
@@ -1290,12 +1800,13 @@ def edit(edit_text=None, randomize=False):
     skip_frequents = True
     do_skip = True
     skip_completed = True
+    texts = Text.load_many(set(all_hashes))
 
     for inx in range(len(all_words)):
         word = all_words[rand_indxs[inx]]
 
         # skip "frequent" words 90% of the time
-        if skip_frequents and frequents and word in frequents:
+        if skip_frequents and is_frequent(word):
             random.shuffle(ten_nums)
             if ten_nums[0] != 0:
                 continue
@@ -1307,7 +1818,7 @@ def edit(edit_text=None, randomize=False):
         list_index = all_list_inxs[rand_indxs[inx]]
         word_index = all_word_inxs[rand_indxs[inx]]
 
-        edit_text = Text(hash)
+        edit_text = texts.get(hash, None) or Text(hash)
 
         current_hash = hash # global
         prev_context = None
@@ -1319,8 +1830,7 @@ def edit(edit_text=None, randomize=False):
         text_sents_file = os.path.join(text_sents_dir, current_language, f"{hash}.json")
         text_sents_list = None
         try:
-            with open(text_sents_file, 'r', encoding='utf-8') as f:
-                text_sents_list = json.load(f)
+            text_sents_list = load_json(text_sents_file)
         except FileNotFoundError:
             err_msg = "Error in {}: {} not found."
             print(err_msg.format("".join(["ed","it"]), text_sents_file))
@@ -1328,8 +1838,7 @@ def edit(edit_text=None, randomize=False):
         text_words_file = os.path.join(text_words_dir, current_language, f"{hash}.json")
 
         try:
-            with open(text_words_file, 'r', encoding='utf-8') as f:
-                parsed_text = json.load(f)
+            parsed_text = load_json(text_words_file)
                 #break
         except FileNotFoundError:
             print(f"Error in edit (): File '{text_words_file}' not found.")
@@ -1358,7 +1867,7 @@ def edit(edit_text=None, randomize=False):
         if not skip_completed:
             skip_completed = True
 
-        if hash != last_hash or glob_words_index_count == default_words_index_count:
+        if hash != last_hash:
             _, native_sentences, alt_sentences = create_sentences(hash, alt=alt_representation_required)
         last_hash = hash
 
@@ -1388,7 +1897,8 @@ def edit(edit_text=None, randomize=False):
         if alt_sentence:
             alt_sentence = "\n> " + colour_sentence(
                 alt_sentence, word, [meaning["index"]],
-                colors=[Fore.BLACK, Fore.WHITE]
+                colors=[Fore.BLACK, Fore.WHITE],
+                sent_inx=meaning.get("sent_inx", None)
             )
         if native_sent:
             native_sent = f"{Fore.GREEN}>{Style.RESET_ALL} " + colour_sentence(
@@ -1396,6 +1906,7 @@ def edit(edit_text=None, randomize=False):
                 orig_sent=formatted_sent,
                 colors=[Fore.BLACK, Fore.BLUE],
                 bg_clr=Back.BLUE,
+                sent_inx=meaning.get("sent_inx", None),
                 add_stress_marks=False,
                 space_char="/"
             )
@@ -1453,7 +1964,8 @@ def edit(edit_text=None, randomize=False):
                 word,
                 [meaning["index"]],
                 colors=([Fore.BLACK, Fore.BLUE]),
-                add_stress_marks=not alt_representation_required
+                add_stress_marks=not alt_representation_required,
+                sent_inx=meaning.get("sent_inx", None)
             )
             the_sent = f"\n{Fore.MAGENTA}>{Style.RESET_ALL} " + the_sent
 
@@ -1756,7 +2268,7 @@ def edit(edit_text=None, randomize=False):
                     break
             elif input_cmd == 'globals':
                 alert(f"current_hash: {current_hash}")
-                alert(f"glob_words_index_count: {glob_words_index_count}")
+                alert(f"glob_words_index_lang: {glob_words_index_lang}")
                 pass
             elif input_cmd == 'more':
                 print("\n")
@@ -1963,27 +2475,21 @@ def edit(edit_text=None, randomize=False):
             sugg_dict = {}
 
             # let's only backup a file once per session
-            if not backup_present.get("hash", "") and not backup_text_words(hash, text_words_file):
+            if not backup_present.get(hash, "") and not backup_text_words(hash, text_words_file):
                 print("Word data cannot be saved since backup failed.")
             else:
                 # Save the edits
                 try:
-                    with open(text_words_file, "w", encoding="utf-8") as f:
-                        json.dump(parsed_text, f, indent=2)
-                    glob_words_index_count -= 1
+                    save_json(text_words_file, parsed_text)
+                    set_word_counts(hash, parsed_text, flush=False)
+                    update_word_index(hash, parsed_text, text_words_file)
+                    # rebuild the sentences with the saved edits
+                    last_hash = None
                     backup_present[hash] = True
                 except (FileNotFoundError, json.JSONDecodeError) as e:
                     print(f"Error saving word data: {e}")
                     return False
 
-        # this needs to stay in the main loop
-        if glob_words_index_count <= 1:
-            if not index_words(current_language):
-                return False
-            with open(os.path.join(words_dir, f"{current_language}_index.json"), 'r') as f:
-                GLOBAL_WORD_INDEX = json.load(f)
-            glob_words_index_count = default_words_index_count
-
         # keep this after the above save
         if save_and_cont:
             continue
@@ -2019,12 +2525,573 @@ def get_user_suggestion(suggestions, fieldname):
         return False
     return edit_input
 
+def _text_words_index_records(text_hash, parsed_text, deferred=None, frequent=None):
+    """
+    Returns the index records ({word: [record, ...]}) of one text_words file.
+    Records of new frequent words that were left out are appended to
+    "deferred" as [word, record] pairs if it is given. "frequent" is the set
+    of frequent words (default: get_frequent_words()).
+    """
+    if frequent is None:
+        frequent = get_frequent_words()
+    word_index = {}
+    for word, word_data in parsed_text.items():
+        for i, meaning in enumerate(word_data):
+            if meaning.get("skip", ""):
+                continue
+
+            i_index = meaning.get("index", -1)
+            i_type = meaning.get("type", "")
+            i_base = meaning.get("base", "")
+            i_translation = meaning.get("translation", "")
+            i_base_translation = meaning.get("base_translation", "")
+            i_alt_representation = meaning.get("alt_representation", "")
+            i_special_alt_rep = meaning.get("special_alt_rep", "")
+            orig_spec_alt_rep = i_special_alt_rep
+            i_stress_marks = meaning.get("stress_marks", "")
+            i_tags = meaning.get("tags", "")
+
+            record = {
+                "hash": text_hash,
+                "list_index": i,
+                "index": i_index,
+                "sent_inx": meaning.get("sent_inx", "")
+            }
+
+            if i_type:
+                i_type = abbrev_wordtype(i_type)
+                record["type"] = i_type
+            if i_base:
+                # if base is same as word, then store abbreviation value of "_w_" unless base is shorter
+                if i_base == word and len("_w_") < std_len(i_base):
+                    i_base = "_w_"
+                record["base"] = i_base
+            if i_translation:
+                record["translation"] = i_translation
+            if i_base_translation:
+                # if base_translation is same as translation, then store abbreviation value of "_t_" unless base_translation is shorter
+                if i_base_translation == i_translation and len("_t_") < std_len(i_base_translation):
+                    i_base_translation = "_t_"
+                record["base_translation"] = i_base_translation
+            if i_alt_representation:
+                # if alt_representation is same as word, then store abbreviation value of "_w_" unless alt_representation is shorter
+                if i_alt_representation == word and len("_w_") < std_len(i_alt_representation):
+                    i_alt_representation = "_w_"
+                record["alt_representation"] = i_alt_representation
+            if i_special_alt_rep:
+                # if i_special_alt_rep is same as alt_representation, then store abbreviation value of "_a_" unless special_alt_rep is shorter
+                if i_special_alt_rep == i_alt_representation and len("_a_") < std_len(i_special_alt_rep):
+                    i_special_alt_rep = "_a_"
+                # if i_special_alt_rep is same as word, then store abbreviation value of "_w_" unless special_alt_rep is shorter
+                elif i_special_alt_rep == word and len("_w_") < std_len(i_special_alt_rep):
+                    i_special_alt_rep = "_w_"
+                record["special_alt_rep"] = i_special_alt_rep
+            if i_stress_marks:
+                record["stress_marks"] = i_stress_marks
+            if i_tags:
+                record["tags"] = i_tags
+
+            if (word in frequent and
+                not i_base and not i_translation and
+                not i_base_translation and not i_alt_representation and
+                not i_special_alt_rep and not i_stress_marks):
+                # skip new frequent words 90% of time.
+                # otherwise, they just clog up the index.
+                # they'll get in sooner or later :)
+                ten_nums = [i for i in range(10)]
+                random.shuffle(ten_nums)
+                if ten_nums[1] != 1:
+                    if deferred is not None:
+                        deferred.append([word, record])
+                    continue
+
+            word_index.setdefault(word, []).append(record)
+
+            if orig_spec_alt_rep and orig_spec_alt_rep != word:
+                if orig_spec_alt_rep not in word_index:
+                    word_index[orig_spec_alt_rep] = []
+
+                word_index[orig_spec_alt_rep].append({
+                    "word_ptr": word,
+                    "hash": text_hash,
+                    "index": i_index,
+                    "sent_inx": meaning.get("sent_inx", "")
+                })
+    return {word: [IndexRecord(r) for r in records] for word, records in word_index.items()}
+
+# The word index is kept up to date per text_words file: the manifest maps
+# every indexed text hash to the fingerprint of its text_words file and the
+# index keys it contributed to, so a changed file's records can be replaced.
+# "secondary" holds the language's secondary indexes (see secondary_indexes).
+_word_index_manifest = {"language": None, "files": {}, "secondary": {}}
+
+def _word_index_paths(language):
+    extension = "bin" if word_index_format == "binary" else "json"
+    return (os.path.join(words_dir, f"{language}_index.{extension}"),
+            os.path.join(words_dir, f"{language}_manifest.json"))
+
+def _secondary_index_path(language, name):
+    return os.path.join(words_dir, f"{language}_{name}.json")
+
+def _normalize_translation(translation):
+    """Splits a translation into the lowercase meanings it lists."""
+    return [t.strip().lower() for t in re.split(r"[,;]", translation) if t.strip()]
+
+def _translation_keys(word, record):
+    keys = set()
+    for key in ("translation", "base_translation"):
+        value = _index_value(record, word, key)
+        if value:
+            keys.update(_normalize_translation(value))
+    return keys
+
+def _base_keys(word, record):
+    # some words have several bases, eg. матері (матір,мати)
+    return {b.strip() for b in _index_value(record, word, "base").split(",") if b.strip()}
+
+def _type_keys(word, record):
+    # types are already abbreviated in the index
+    return {record["type"]} if record.get("type", "") else set()
+
+def _tag_keys(word, record):
+    tags = record.get("tags", "")
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return {t.strip() for t in tags if t.strip()}
+
+# Secondary indexes kept with every language's word index, each saved as
+# words/<lang>_<name>.json and shaped {key: [hash, word, list_index, hash,
+# word, list_index, ...]}: one flat list per key, with the hashes and words
+# interned when loaded, so a posting costs three references. The functions
+# return the keys an index record is filed under. Every manifest entry lists
+# the keys its text added under the index's name.
+secondary_indexes = {
+    "xlate": _translation_keys,
+    "bases": _base_keys,
+    "types": _type_keys,
+    "tags": _tag_keys
+}
+
+def _secondary_postings(records):
+    """Returns {name: {key: [hash, word, list_index, ...]}} for one text's index records."""
+    postings = {}
+    for name, record_keys in secondary_indexes.items():
+        name_postings = postings[name] = {}
+        for word, word_records in records.items():
+            for record in word_records:
+                if "word_ptr" in record:
+                    continue
+                for key in record_keys(word, record):
+                    name_postings.setdefault(key, []).extend((record["hash"], word, record["list_index"]))
+    return postings
+
+def _iter_postings(key_postings):
+    """Yields (word, hash, list_index) for the postings of one secondary index key."""
+    for i in range(0, len(key_postings), 3):
+        yield key_postings[i + 1], key_postings[i], key_postings[i + 2]
+
+def _remove_secondary_keys(secondary, text_hash, entry):
+    for name in secondary_indexes:
+        index = secondary.setdefault(name, {})
+        for key in entry.get(name, []):
+            key_postings = index.get(key, [])
+            kept = []
+            for i in range(0, len(key_postings), 3):
+                if key_postings[i] != text_hash:
+                    kept.extend(key_postings[i:i + 3])
+            if kept:
+                index[key] = kept
+            else:
+                index.pop(key, None)
+
+def _build_secondary_index(name, word_index, files):
+    index = {}
+    record_keys = secondary_indexes[name]
+    text_keys = {}
+    for word, records in word_index.items():
+        for record in records:
+            if "word_ptr" in record:
+                continue
+            for key in record_keys(word, record):
+                index.setdefault(key, []).extend((record["hash"], word, record["list_index"]))
+                text_keys.setdefault(record["hash"], set()).add(key)
+    for text_hash, entry in files.items():
+        entry[name] = sorted(text_keys.get(text_hash, ()))
+    return index
+
+def _load_secondary_index(language, name):
+    """
+    Returns a saved secondary index with its hashes and words interned, or
+    None if it is in the older [[word, hash, list_index], ...] shape.
+    """
+    index = load_json(_secondary_index_path(language, name))
+    for key_postings in index.values():
+        if key_postings and isinstance(key_postings[0], list):
+            return None
+        key_postings[0::3] = [sys.intern(text_hash) for text_hash in key_postings[0::3]]
+        key_postings[1::3] = [sys.intern(word) for word in key_postings[1::3]]
+    return index
+
+def _load_word_index(language):
+    """Returns the saved (index, manifest files, secondary indexes) of a language, or empty ones."""
+    index_path, manifest_path = _word_index_paths(language)
+    try:
+        files = load_json(manifest_path)
+        if any("tags" not in entry for entry in files.values()):
+            # saved before index records carried tags; reindex every text
+            return {}, {}, {}
+        for entry in files.values():
+            # queue rows are no longer kept in the manifest
+            entry.pop("queue", None)
+        if word_index_format == "binary":
+            word_index = MappedWordIndex(index_path)
+        else:
+            word_index = {word: [IndexRecord(r) for r in records]
+                          for word, records in load_json(index_path).items()}
+    except (FileNotFoundError, ValueError):
+        return {}, {}, {}
+    secondary = {}
+    for name in secondary_indexes:
+        try:
+            if any(name not in entry for entry in files.values()):
+                raise FileNotFoundError(name)
+            secondary[name] = _load_secondary_index(language, name)
+        except (FileNotFoundError, ValueError):
+            secondary[name] = None
+        if secondary[name] is None:
+            # indexes saved before this secondary index existed or in the
+            # older shape
+            secondary[name] = _build_secondary_index(name, word_index, files)
+    return word_index, files, secondary
+
+def _save_word_index(language, word_index, files, secondary):
+    """Writes the index and its manifest, and returns the index to use from now on."""
+    index_path, manifest_path = _word_index_paths(language)
+    os.makedirs(words_dir, exist_ok=True)
+    # without a manifest the next run rebuilds, so a crash between the two
+    # writes can't leave a manifest that doesn't describe the index
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    if word_index_format == "binary":
+        tmp_path = index_path + ".tmp"
+        write_word_index(tmp_path, word_index)
+        if isinstance(word_index, MappedWordIndex):
+            word_index.close()
+        os.replace(tmp_path, index_path)
+        word_index = MappedWordIndex(index_path)
+    else:
+        save_json(index_path, word_index)
+    for name, index in secondary.items():
+        save_json(_secondary_index_path(language, name), index)
+    save_json(manifest_path, files)
+    return word_index
+
+def _remove_index_records(word_index, text_hash, words):
+    for word in words:
+        records = [r for r in word_index.get(word, []) if r["hash"] != text_hash]
+        if records:
+            word_index[word] = records
+        else:
+            word_index.pop(word, None)
+
+def _reindex_text(word_index, secondary, entry, text_hash, parsed_text):
+    """
+    Replaces one text's records in word_index and the secondary indexes and
+    updates its manifest entry.
+    """
+    deferred = []
+    records = _text_words_index_records(text_hash, parsed_text, deferred)
+    _splice_text_records(word_index, secondary, entry, text_hash, records, deferred)
+
+def _text_queue_rows(text_hash, entry):
+    """
+    Returns the study queue rows of one indexed text, [word, list_index,
+    index, sent_inx (-1 if none), translated (0 or 1)] in sentence order.
+    They are derived from the text's text_words file when it is streamed,
+    leaving out the records its manifest entry still defers, so they don't
+    have to be kept in memory for every text.
+    """
+    text_words_file = os.path.join(text_words_dir, _word_index_manifest["language"], f"{text_hash}.json")
+    try:
+        parsed_text = load_json(text_words_file)
+    except FileNotFoundError:
+        return []
+    deferred = {(word, record["list_index"]) for word, record in entry.get("deferred", [])}
+    rows = []
+    for word, word_records in _text_words_index_records(text_hash, parsed_text, frequent=()).items():
+        for record in word_records:
+            if "word_ptr" not in record and (word, record["list_index"]) not in deferred:
+                rows.append(_queue_row(word, record))
+    rows.sort(key=lambda row: (row[3], row[2]))
+    return rows
+
+def _queue_row(word, record):
+    sent_inx = record["sent_inx"]
+    return [word, record["list_index"], record["index"], -1 if sent_inx == "" else sent_inx,
+            1 if record.get("translation", "") else 0]
+
+def _splice_text_records(word_index, secondary, entry, text_hash, records, deferred, postings=None):
+    """
+    Puts the records of one text (from _text_words_index_records()) in place
+    of its old ones. postings are the records' _secondary_postings().
+    """
+    if postings is None:
+        postings = _secondary_postings(records)
+    _text_positions["texts"].pop(text_hash, None)
+    _remove_index_records(word_index, text_hash, entry.get("words", []))
+    _remove_secondary_keys(secondary, text_hash, entry)
+    entry["deferred"] = deferred
+    for word, word_records in records.items():
+        word_index.setdefault(word, []).extend(word_records)
+    entry["words"] = list(records)
+    for name in postings:
+        entry[name] = []
+    _add_secondary_postings(secondary, entry, postings)
+
+def _add_secondary_postings(secondary, entry, postings):
+    """Files postings (from _secondary_postings()) in the secondary indexes and the text's manifest entry."""
+    for name, name_postings in postings.items():
+        index = secondary.setdefault(name, {})
+        for key, key_postings in name_postings.items():
+            index.setdefault(key, []).extend(key_postings)
+        entry[name] = sorted(set(entry.get(name, [])) | set(name_postings))
+
+_word_index_dirty = False
+# set when a text was added, so the next index_words() checks the files again
+_word_index_stale = False
+
+_frequency_table = None
+
+def get_frequency_table(language=None):
+    """
+    Returns the corpus frequency table of a language (default: the current
+    one). It is built from all of the language's text_words files the first
+    time, and kept up to date by update_frequencies() afterwards.
+    """
+    global _frequency_table
+    language = language or current_language
+    path = os.path.join(words_dir, f"{language}_freq.json")
+    if _frequency_table is None or _frequency_table.path != path:
+        if _frequency_table and _frequency_table.dirty:
+            _frequency_table.save()
+        _frequency_table = FrequencyTable(path)
+        if not _frequency_table.load():
+            lang_dir = os.path.join(text_words_dir, language)
+            if os.path.isdir(lang_dir):
+                for filename in os.listdir(lang_dir):
+                    if not filename.endswith(".json"):
+                        continue
+                    parsed_text = load_json(os.path.join(lang_dir, filename))
+                    _frequency_table.set_text(filename[:-len(".json")], word_frequencies(parsed_text))
+            _frequency_table.save()
+    return _frequency_table
+
+def update_frequencies(hash, parsed_text=None):
+    """Replaces a text's counts in the current language's frequency table."""
+    if parsed_text is None:
+        text_words_file = os.path.join(text_words_dir, current_language, f"{hash}.json")
+        parsed_text = load_json(text_words_file)
+    get_frequency_table().set_text(hash, word_frequencies(parsed_text))
+
+def get_frequent_words():
+    """Returns the set of words is_frequent() is true for."""
+    if frequent_rank:
+        return {w for w, rank in get_frequency_table().ranks().items() if rank <= frequent_rank}
+    return set(frequents or ())
+
+def is_frequent(word):
+    """
+    Whether word is one of the current language's high-frequency words: ranked
+    within "frequent_rank" in the frequency table if the language sets it,
+    otherwise listed in its "frequents".
+    """
+    if frequent_rank:
+        rank = get_frequency_table().rank(word)
+        return rank is not None and rank <= frequent_rank
+    return bool(frequents) and word in frequents
+
+def show_frequencies(n=20):
+    table = get_frequency_table()
+    for rank, (word, count, docs) in enumerate(table.top(n), start=1):
+        print(f"{rank:>5} {Fore.BLUE + word + Style.RESET_ALL}: {count} ({docs} texts)")
+
+_review_store = None
+
+def get_review_store(language=None, reverse=False):
+    """
+    Returns the review store of a language (default: the current one):
+    words/<lang>_reviews.json, or words/<lang>_rev_reviews.json for reverse
+    study, which is scheduled separately.
+    """
+    global _review_store
+    language = language or current_language
+    path = os.path.join(words_dir, f"{language}_rev_reviews.json" if reverse else f"{language}_reviews.json")
+    if _review_store is None or _review_store.path != path:
+        if _review_store and _review_store.dirty:
+            _review_store.save()
+        _review_store = ReviewStore(path)
+        _review_store.load()
+    return _review_store
+
+def flush_reviews():
+    """Writes the review store if answers were graded since it was loaded or saved."""
+    if _review_store and _review_store.dirty:
+        _review_store.save()
+
+def iter_due_words(n, hash_list=None, include_filters={}):
+    """
+    Yields study queue entries, as iter_word_data() does, for up to n words
+    due for review, earliest first. Each word is shown in one of its
+    translated occurrences, picked at random.
+    """
+    included = _included_postings(include_filters)
+
+    def occurrences(word):
+        return [
+            index_record for index_record in GLOBAL_WORD_INDEX.get(word, [])
+            if (not hash_list or index_record["hash"] in hash_list)
+            and _is_queue_candidate(word, index_record, included, {"translation": ""})
+        ]
+
+    for word in get_review_store().due(n, keep=lambda w: bool(occurrences(w))):
+        index_record = random.choice(occurrences(word))
+        sent_inx = index_record["sent_inx"]
+        yield (word, index_record["hash"], index_record["list_index"], index_record["index"],
+               -1 if sent_inx == "" else sent_inx)
+
+def update_word_index(hash, parsed_text, text_words_file):
+    """
+    Save hook for text_words files: replaces the saved text's records in
+    GLOBAL_WORD_INDEX (word_ptr records included) right away. The index file
+    is written later by flush_word_index().
+    """
+    global _word_index_dirty
+    if (not GLOBAL_WORD_INDEX or glob_words_index_lang != current_language
+        or _word_index_manifest["language"] != current_language):
+        # nothing loaded; the next index_words() reads the changed file
+        return
+    with open(text_words_file, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    stat = os.stat(text_words_file)
+    entry = _word_index_manifest["files"].setdefault(hash, {})
+    entry.update(mtime=stat.st_mtime_ns, size=stat.st_size, sha256=digest)
+    _reindex_text(GLOBAL_WORD_INDEX, _word_index_manifest["secondary"], entry, hash, parsed_text)
+    _word_index_dirty = True
+    update_frequencies(hash, parsed_text)
+
+def flush_word_index():
+    """Writes GLOBAL_WORD_INDEX and its manifest if they changed in memory."""
+    global GLOBAL_WORD_INDEX, _word_index_dirty
+    if _word_index_dirty and GLOBAL_WORD_INDEX:
+        GLOBAL_WORD_INDEX = _save_word_index(_word_index_manifest["language"], GLOBAL_WORD_INDEX,
+                                             _word_index_manifest["files"], _word_index_manifest["secondary"])
+    _word_index_dirty = False
+    if _frequency_table and _frequency_table.dirty:
+        _frequency_table.save()
+
+# Positional view of GLOBAL_WORD_INDEX for colour_sentence():
+# {text_hash: {(sent_inx, index): [(word, record), ...]}}. A text's entry is
+# built from its manifest words on first use and dropped when it is reindexed.
+_text_positions = {"source": None, "texts": {}}
+
+def get_text_positions(text_hash):
+    """
+    Returns the index records of a text by (sent_inx, index), or None if the
+    loaded index doesn't cover the text.
+    """
+    if not GLOBAL_WORD_INDEX or _word_index_manifest["language"] != glob_words_index_lang:
+        return None
+    entry = _word_index_manifest["files"].get(text_hash, None)
+    if entry is None:
+        return None
+    if _text_positions["source"] is not GLOBAL_WORD_INDEX:
+        _text_positions.update(source=GLOBAL_WORD_INDEX, texts={})
+    positions = _text_positions["texts"].get(text_hash, None)
+    if positions is None:
+        positions = {}
+        for word in entry["words"]:
+            for record in GLOBAL_WORD_INDEX.get(word, []):
+                if record["hash"] == text_hash:
+                    key = (record.get("sent_inx", None), record["index"])
+                    positions.setdefault(key, []).append((word, record))
+        _text_positions["texts"][text_hash] = positions
+    return positions
+
+def _index_value(record, word, key):
+    value = record.get(key, "")
+    if value == "_w_":
+        return word
+    elif value == "_t_":
+        return record.get("translation", "")
+    elif value == "_a_":
+        return record.get("alt_representation", "")
+    return value
+
+def _position_stress_marks(entries, word, special_alt_rep=None):
+    """
+    Returns the stress marks of word's records among the entries of one
+    position, most frequent first (like search_word_index()).
+    """
+    counts = {}
+    for entry_word, record in entries:
+        if entry_word != word or "word_ptr" in record:
+            continue
+        if special_alt_rep is not None and _index_value(record, word, "special_alt_rep") != special_alt_rep:
+            continue
+        stress_marks = _index_value(record, word, "stress_marks")
+        if stress_marks:
+            counts[stress_marks] = counts.get(stress_marks, 0) + 1
+    return sorted(counts, key=counts.get, reverse=True)
+
+def _position_word_ptr(entries, word):
+    for entry_word, record in entries:
+        if entry_word == word and record.get("word_ptr", ""):
+            return record["word_ptr"]
+    return None
+
+# what _index_text_words_file() needs in index_words()'s worker processes
+_index_worker_frequent = None
+
+def _init_index_worker(frequent, alt_required):
+    global _index_worker_frequent, alt_representation_required
+    _index_worker_frequent = frequent
+    alt_representation_required = alt_required
+
+def _index_text_words_file(text_hash, text_words_file, known_digest, frequent=None):
+    """
+    Fingerprints and parses one text_words file for index_words(). Returns
+    (fingerprint, records, deferred, postings), with records None if the content hash
+    equals known_digest, or None if the file is gone.
+    """
+    if frequent is None:
+        frequent = _index_worker_frequent
+    try:
+        stat = os.stat(text_words_file)
+        with open(text_words_file, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+    text_stat = {"mtime": stat.st_mtime_ns, "size": stat.st_size,
+                 "sha256": hashlib.sha256(content).hexdigest()}
+    if text_stat["sha256"] == known_digest:
+        return text_stat, None, [], None
+    deferred = []
+    records = _text_words_index_records(text_hash, codec.loads(content), deferred, frequent)
+    return text_stat, records, deferred, _secondary_postings(records)
+
 def index_words(language):
-    global GLOBAL_WORD_INDEX, glob_words_index_lang, glob_words_index_count
+    """
+    Brings GLOBAL_WORD_INDEX up to date for language. Only the text_words files
+    whose fingerprint (mtime, size, sha256) differs from the manifest are
+    re-read, and their records are spliced into the existing index. Like
+    update_word_index(), it leaves writing the index to flush_word_index().
+    """
+    global GLOBAL_WORD_INDEX, glob_words_index_lang
+    global _word_index_dirty, _word_index_stale
 
     if (GLOBAL_WORD_INDEX
         and glob_words_index_lang == language
-        and glob_words_index_count > 1):
+        and not _word_index_stale):
         # no need to reindex
         return True
 
@@ -2033,111 +3100,182 @@ def index_words(language):
         print("Error: no metadata found")
         return False
 
-    word_index = {}
-    language_found = False
-    for text_hash, text_data in metadata.items():
-        if text_data.get("language").lower() == language:
-            language_found = True
-            text_words_file = os.path.join(text_words_dir, current_language, f"{text_hash}.json")
-            try:
-                with open(text_words_file, 'r', encoding='utf-8') as f:
-                    parsed_text = json.load(f)
-            except FileNotFoundError:
-                print(f"Error in {'_'.join('index', 'words')}(): Could not find text words file.")
-                return False
-
-            for word, word_data in parsed_text.items():
-                for i, meaning in enumerate(word_data):
-                    if meaning.get("skip", ""):
-                        continue
-
-                    i_index = meaning.get("index", -1)
-                    i_type = meaning.get("type", "")
-                    i_base = meaning.get("base", "")
-                    i_translation = meaning.get("translation", "")
-                    i_base_translation = meaning.get("base_translation", "")
-                    i_alt_representation = meaning.get("alt_representation", "")
-                    i_special_alt_rep = meaning.get("special_alt_rep", "")
-                    orig_spec_alt_rep = i_special_alt_rep
-                    i_stress_marks = meaning.get("stress_marks", "")
-
-                    if (frequents and word in frequents and
-                        not i_base and not i_translation and
-                        not i_base_translation and not i_alt_representation and
-                        not i_special_alt_rep and not i_stress_marks):
-                        # skip new frequent words 90% of time.
-                        # otherwise, they just clog up the index.
-                        # they'll get in sooner or later :)
-                        ten_nums = [i for i in range(10)]
-                        random.shuffle(ten_nums)
-                        if ten_nums[1] != 1:
-                            continue
-
-                    if word not in word_index:
-                        word_index[word] = []
-
-                    word_index[word].append({
-                        "hash": text_hash,
-                        "list_index": i,
-                        "index": i_index,
-                        "sent_inx": meaning.get("sent_inx", "")
-                    })
-
-                    if i_type:
-                        i_type = abbrev_wordtype(i_type)
-                        word_index[word][len(word_index[word])-1]["type"] = i_type
-                    if i_base:
-                        # if base is same as word, then store abbreviation value of "_w_" unless base is shorter
-                        if i_base == word and len("_w_") < std_len(i_base):
-                            i_base = "_w_"
-                        word_index[word][len(word_index[word])-1]["base"] = i_base
-                    if i_translation:
-                        word_index[word][len(word_index[word])-1]["translation"] = i_translation
-                    if i_base_translation:
-                        # if base_translation is same as translation, then store abbreviation value of "_t_" unless base_translation is shorter
-                        if i_base_translation == i_translation and len("_t_") < std_len(i_base_translation):
-                            i_base_translation = "_t_"
-                        word_index[word][len(word_index[word])-1]["base_translation"] = i_base_translation
-                    if i_alt_representation:
-                        # if alt_representation is same as word, then store abbreviation value of "_w_" unless alt_representation is shorter
-                        if i_alt_representation == word and len("_w_") < std_len(i_alt_representation):
-                            i_alt_representation = "_w_"
-                        word_index[word][len(word_index[word])-1]["alt_representation"] = i_alt_representation
-                    if i_special_alt_rep:
-                        # if i_special_alt_rep is same as alt_representation, then store abbreviation value of "_a_" unless special_alt_rep is shorter
-                        if i_special_alt_rep == i_alt_representation and len("_a_") < std_len(i_special_alt_rep):
-                            i_special_alt_rep = "_a_"
-                        # if i_special_alt_rep is same as word, then store abbreviation value of "_w_" unless special_alt_rep is shorter
-                        elif i_special_alt_rep == word and len("_w_") < std_len(i_special_alt_rep):
-                            i_special_alt_rep = "_w_"
-                        word_index[word][len(word_index[word])-1]["special_alt_rep"] = i_special_alt_rep
-                    if i_stress_marks:
-                        word_index[word][len(word_index[word])-1]["stress_marks"] = i_stress_marks
-
-                    if orig_spec_alt_rep and orig_spec_alt_rep != word:
-                        if orig_spec_alt_rep not in word_index:
-                            word_index[orig_spec_alt_rep] = []
-
-                        word_index[orig_spec_alt_rep].append({
-                            "word_ptr": word,
-                            "hash": text_hash,
-                            "index": i_index
-                        })
-
-    if not language_found:
+    if GLOBAL_WORD_INDEX and glob_words_index_lang == language and _word_index_manifest["language"] == language:
+        word_index = GLOBAL_WORD_INDEX
+        files = _word_index_manifest["files"]
+        secondary = _word_index_manifest["secondary"]
+    else:
+        flush_word_index()
+        word_index, files, secondary = _load_word_index(language)
+
+    index_changed = False
+    text_hashes = [h for h, m in metadata.items() if m.get("language").lower() == language]
+    to_read = []
+    for text_hash in text_hashes:
+        text_words_file = os.path.join(text_words_dir, language, f"{text_hash}.json")
+        try:
+            stat = os.stat(text_words_file)
+        except FileNotFoundError:
+            print("Error in index_words(): Could not find text words file.")
+            return False
+        known = files.get(text_hash, {})
+        if known.get("mtime") == stat.st_mtime_ns and known.get("size") == stat.st_size:
+            continue
+        to_read.append((text_hash, text_words_file, known.get("sha256")))
+
+    # results come back in to_read order, so the index is merged the same way
+    # however many processes parsed the files
+    hashes, paths, digests = zip(*to_read) if to_read else ((), (), ())
+    frequent = get_frequent_words()
+    jobs = index_jobs or os.cpu_count() or 1
+    if jobs > 1 and len(to_read) > 16:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_index_worker,
+                                 initargs=(frequent, alt_representation_required)) as executor:
+            chunksize = max(1, min(16, len(to_read) // (4*jobs)))
+            results = list(executor.map(_index_text_words_file, hashes, paths, digests, chunksize=chunksize))
+    else:
+        # starting worker processes costs more than parsing a few files
+        results = list(map(_index_text_words_file, hashes, paths, digests, repeat(frequent)))
+    for text_hash, result in zip(hashes, results):
+        if result is None:
+            print("Error in index_words(): Could not find text words file.")
+            return False
+        text_stat, records, deferred, postings = result
+        entry = dict(files.get(text_hash, {}), **text_stat)
+        if records is not None:
+            _splice_text_records(word_index, secondary, entry, text_hash, records, deferred, postings)
+            index_changed = True
+        files[text_hash] = entry
+
+    # new frequent words that were left out get the same 10% chance on every
+    # reindex as they had when the whole index was rebuilt each time
+    for entry in files.values():
+        still_deferred = []
+        promoted = {}
+        for word, record in entry.get("deferred", []):
+            if random.randrange(10) != 0:
+                still_deferred.append([word, record])
+                continue
+            record = IndexRecord(record)
+            promoted.setdefault(word, []).append(record)
+            word_index.setdefault(word, []).append(record)
+            if word not in entry["words"]:
+                entry["words"].append(word)
+            _text_positions["texts"].pop(record["hash"], None)
+            index_changed = True
+        if promoted:
+            _add_secondary_postings(secondary, entry, _secondary_postings(promoted))
+        entry["deferred"] = still_deferred
+
+    for text_hash in set(files) - set(text_hashes):
+        entry = files.pop(text_hash)
+        _remove_index_records(word_index, text_hash, entry["words"])
+        _remove_secondary_keys(secondary, text_hash, entry)
+        _text_positions["texts"].pop(text_hash, None)
+        index_changed = True
+
+    if not text_hashes:
         print(f"{language} not found in metadata file. Aborting.")
         return False
     if not word_index:
         print("No words found to index. Aborting.")
         return False
-    os.makedirs(words_dir, exist_ok=True)
-    with open(os.path.join(words_dir, f"{language}_index.json"), 'w') as f:
-        json.dump(word_index, f, indent=2)
+    _word_index_manifest.update(language=language, files=files, secondary=secondary)
+    if index_changed or not os.path.exists(_word_index_paths(language)[1]):
+        _word_index_dirty = True
     GLOBAL_WORD_INDEX = word_index
     glob_words_index_lang = language
-    glob_words_index_count = default_words_index_count
+    _word_index_stale = False
     return True
 
+# secondary indexes of languages other than the loaded one, by file stamp
+_secondary_index_cache = {}
+
+def get_secondary_index(language, name):
+    """Returns a secondary index of any language ({} if it has none)."""
+    if language == _word_index_manifest["language"]:
+        return _word_index_manifest["secondary"].get(name, {})
+    path = _secondary_index_path(language, name)
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return {}
+    cached = _secondary_index_cache.get((language, name), None)
+    if not cached or cached[0] != stamp:
+        # an index in the older shape is rebuilt when its language is indexed
+        cached = _secondary_index_cache[(language, name)] = (stamp, _load_secondary_index(language, name) or {})
+    return cached[1]
+
+def find_translations(translation):
+    """
+    Returns (language, word, hash, list_index) for every indexed word, in any
+    language, that has "translation" as its translation or base translation.
+    """
+    key = translation.strip().lower()
+    languages = set()
+    if os.path.isdir(words_dir):
+        languages = {f[:-len("_xlate.json")] for f in os.listdir(words_dir) if f.endswith("_xlate.json")}
+    loaded_language = _word_index_manifest["language"]
+    if loaded_language:
+        languages.add(loaded_language)
+
+    results = []
+    for language in sorted(languages):
+        for word, text_hash, list_index in _iter_postings(get_secondary_index(language, "xlate").get(key, [])):
+            results.append((language, word, text_hash, list_index))
+    return results
+
+def show_translations(translation):
+    results = find_translations(translation)
+    if not results:
+        print(f"No words found with the translation '{translation}'.")
+        return
+    counts = {}
+    for language, word, _, _ in results:
+        counts[(language, word)] = counts.get((language, word), 0) + 1
+    for (language, word), count in counts.items():
+        print(f"{language}: {Fore.BLUE + word + Style.RESET_ALL} ({count})")
+
+def get_base_forms(base):
+    """
+    Returns {form: [record, ...]} of every word in the loaded word index that
+    has base as (one of) its bases, including the base itself if it is indexed
+    as its own base.
+    """
+    forms = {}
+    for word, text_hash, list_index in _iter_postings(_word_index_manifest["secondary"].get("bases", {}).get(base, [])):
+        for record in GLOBAL_WORD_INDEX.get(word, []):
+            if record["hash"] == text_hash and record.get("list_index") == list_index:
+                forms.setdefault(word, []).append(record)
+    return forms
+
+def show_paradigm(word):
+    """Lists all indexed forms sharing word's base(s), with their counts and translations."""
+    if not index_words(current_language):
+        return
+    bases = set()
+    for record in GLOBAL_WORD_INDEX.get(word, []):
+        if "word_ptr" not in record:
+            bases |= _base_keys(word, record)
+    if not bases:
+        # word may be a base that is not in a text itself
+        bases = {word}
+    found = False
+    for base in sorted(bases):
+        forms = get_base_forms(base)
+        if not forms:
+            continue
+        found = True
+        print(f"{Fore.BLUE + base + Style.RESET_ALL}:")
+        for form, records in sorted(forms.items(), key=lambda f: len(f[1]), reverse=True):
+            translations = []
+            for record in records:
+                translation = _index_value(record, form, "translation")
+                if translation and translation not in translations:
+                    translations.append(translation)
+            print(f"  {form} ({len(records)}) {'; '.join(translations)}")
+    if not found:
+        print(f"No forms found for '{word}'.")
+
 def validate_language(lang):
     try:
         langs_file = os.path.join(data_dir, "languages.json")
@@ -2159,7 +3297,7 @@ def get_langdata(lang, user_friendly=False, quiet=False):
     global alt_representation_required, ignore_spaces_in_rev_study
     global underscore, edit_inputs, yes_letter, exit_letter, all_letter
     global no_letter, copy_quotes, copy_string, alphabet, current_language
-    global frequents
+    global frequents, frequent_rank
 
     set_lang_defaults()
 
@@ -2237,6 +3375,9 @@ def get_langdata(lang, user_friendly=False, quiet=False):
             if "frequents" in lang_data:
                 frequents = lang_data["frequents"]
 
+            if "frequent_rank" in lang_data:
+                frequent_rank = lang_data["frequent_rank"]
+
             if "copy_quotes" in lang_data:
                 copy_quotes = lang_data["copy_quotes"]
 
@@ -2277,8 +3418,7 @@ def get_langdata(lang, user_friendly=False, quiet=False):
 
 def get_full_hash(hash_substring):
 
-    ensure_text_hashes_populated()
-    matching_hashes = [h for h in text_hashes if h.startswith(hash_substring)]
+    matching_hashes = find_hashes(hash_substring)
 
     if len(matching_hashes) == 0:
         print(f"No text found with hash substring '{hash_substring}'.")
@@ -2319,8 +3459,7 @@ def parse_sentences(full_hash):
 
     try:
         os.makedirs(sent_dir, exist_ok=True)
-        with open(sent_filepath, "w", encoding="utf-8") as f:
-            json.dump(sent_data, f, indent=2)
+        save_json(sent_filepath, sent_data)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Error processing text: {e}")
         return False
@@ -2334,16 +3473,12 @@ def parse_text(full_hash):
     sent_filepath = os.path.join(text_sents_dir, current_language, full_hash + ".json")
 
     try:
-        with open(sent_filepath, "r", encoding="utf-8") as f:
-            sentences = json.load(f)
+        sentences = load_json(sent_filepath)
     except FileNotFoundError:
         print(f"Error: Sentence file '{sent_filepath}' not found.")
         return False
 
-    try:
-        with open(text_filepath, "r", encoding="utf-8") as f:
-            pass
-    except FileNotFoundError:
+    if not os.path.exists(text_filepath):
         print(f"Error: text file '{text_filepath}' not found.")
         return False
 
@@ -2382,8 +3517,7 @@ def parse_text(full_hash):
     text_sents_file = os.path.join(text_sents_dir, current_language, f"{full_hash}.json")
     text_sents_list = None
     try:
-        with open(text_sents_file, 'r', encoding='utf-8') as f:
-            text_sents_list = json.load(f)
+        text_sents_list = load_json(text_sents_file)
     except FileNotFoundError:
         err_msg = "Error in {}: {} not found."
         print(err_msg.format("_".join(["parse","text"]), text_sents_file))
@@ -2391,8 +3525,7 @@ def parse_text(full_hash):
 
     # Load existing word data if it exists
     try:
-        with open(word_filepath, "r", encoding="utf-8") as f:
-            parsed_data = json.load(f)
+        parsed_data = load_json(word_filepath)
         for word, meanings in parsed_data.items():
             if word not in word_data:
                 # Add phrase data directly
@@ -2416,12 +3549,13 @@ def parse_text(full_hash):
     try:
         word_dirpath = os.path.join(text_words_dir, current_language)
         os.makedirs(word_dirpath, exist_ok=True)
-        with open(word_filepath, "w", encoding="utf-8") as f:
-            json.dump(word_data, f, indent=2)
+        save_json(word_filepath, word_data)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Error processing text: {e}")
         return False
 
+    set_word_counts(full_hash, word_data)
+
     #if not index_words(lang):
         #return False
     return True
@@ -2431,7 +3565,11 @@ def help(more=False):
   if not more:
       print("Try these commands:")
       print("  > list          (this shows all texts available for study)")
+      print("  > list nf 20 sort:-percent   (filters: label:, tag:, pct:0-50, age:<days>; sort: date, count, percent)")
       print("  > study 12435   (this allows you to study the text with hash 12435)")
+      print("  > study verb tag:n5   (study only words of a type or with a tag, in all texts or one)")
+      print("  > study due 30  (review the 30 words that have been due the longest)")
+      print("  > freq 50       (this shows the 50 most frequent words of the current language)")
       print("  > edit 12435    (this allows you to add meanings and other data to the text with hash 12435)")
       print("  > edit japanese (this allows you to add meanings and other data to any Japanese words, etc.)")
       print()
@@ -2463,7 +3601,7 @@ def set_lang_defaults():
     global alt_representation_required, ignore_spaces_in_rev_study
     global underscore, edit_inputs, yes_letter, exit_letter, all_letter
     global no_letter, copy_quotes, copy_string, alphabet
-    global frequents
+    global frequents, frequent_rank
 
     sent_delims = default_sent_delims
     sent_post_delims = default_sent_post_delims
@@ -2480,6 +3618,7 @@ def set_lang_defaults():
     all_letter = default_all_letter
     alphabet = default_alphabet
     frequents = default_frequents
+    frequent_rank = default_frequent_rank
 
 def add_stress(word, stresses, stress_colours={"bg": Back.BLUE, "fg": Fore.YELLOW}, norm_colours={"fg": Fore.BLUE}):
     if not stresses:
@@ -2779,6 +3918,19 @@ def search_word_index(word,
                             suggestions.add(sing)
                             cnt_dict[sing] = 1 if not cnt_dict.get(sing, "") else cnt_dict[sing]+1
 
+    # forms sharing the base have the same base translation
+    if base and "base_translation" in search_keys and _word_index_manifest["language"] == glob_words_index_lang:
+        for one_base in {b.strip() for b in base.split(",")}:
+            for form, records in get_base_forms(one_base).items():
+                if form == word:
+                    continue
+                for meaning in records:
+                    new_sugg = _index_value(meaning, form, "base_translation")
+                    if new_sugg:
+                        sugg_dict.setdefault("base_translation", []).append(new_sugg)
+                        suggestions.add(new_sugg)
+                        cnt_dict[new_sugg] = cnt_dict.get(new_sugg, 0) + 1
+
     suggestions.discard("")
 
     if suggestions:
@@ -2800,7 +3952,13 @@ def colour_sentence(sentence, word, indices,
                     word_delim=None,
                     space_char=" ",
                     add_stress_marks=True,
-                    phrase_space_char=" "):
+                    phrase_space_char=" ",
+                    sent_inx=None):
+    """
+    With sent_inx (the sentence's index in the text), index records are
+    looked up by position in get_text_positions() instead of searching the
+    word index.
+    """
 
     global current_hash
 
@@ -2818,12 +3976,18 @@ def colour_sentence(sentence, word, indices,
     # Construct the colored sentence
     colored_sentence = ""
     match_keys = {"hash": current_hash}
+    positions = None
+    if type(sent_inx) is int and sent_inx >= 0:
+        positions = get_text_positions(current_hash)
     for i, w in enumerate(words_in_sentence):
         word_colored = False
         w = w.replace(format_delim_phrase, phrase_space_char)
         match_keys["index"] = i
         if alt_representation_required:
             match_keys["special_alt_rep"] = w.replace(phrase_space_char, " ").strip().strip(word_delims).lower()
+        if positions is not None:
+            # word_ptr records of indexes built before they had a sent_inx are under None
+            entries = positions.get((sent_inx, i), []) + positions.get((None, i), [])
         for j in indices:
             # "i" in this range means we've found the word being studied
             if j <= i < (j + len(word.split())):
@@ -2833,7 +3997,10 @@ def colour_sentence(sentence, word, indices,
                     w = w.replace(bare_word, unsc_word)
                     colored_sentence += hili_clr + w + Style.RESET_ALL + space_char
                 else:
-                    stress_marks, _ = search_word_index(word, match_keys=match_keys, search_keys=["stress_marks"])
+                    if positions is not None:
+                        stress_marks = _position_stress_marks(entries, word, match_keys.get("special_alt_rep", None))
+                    else:
+                        stress_marks, _ = search_word_index(word, match_keys=match_keys, search_keys=["stress_marks"])
                     if stress_marks == "(none)":
                         stress_marks = None
                     bare_word = w.replace(phrase_space_char, " ").strip().strip(word_delims)
@@ -2853,22 +4020,30 @@ def colour_sentence(sentence, word, indices,
 
             bare_word = w.replace(phrase_space_char, " ").strip().strip(word_delims)
             stressed_word = None
-            _, results_dict = search_word_index(
-                bare_word.lower(),
-                match_keys=match_keys,
-                search_keys=["stress_marks", "translation", "skip"]
-            )
 
             if add_stress_marks:
-                stress_marks = results_dict.get("stress_marks", None)
-                if not stress_marks:
-                    ptr_match_keys = {"hash": current_hash, "index": i}
-                    stress_marks, _ = search_word_index(
+                if positions is not None:
+                    stress_marks = _position_stress_marks(entries, bare_word.lower(),
+                                                          match_keys.get("special_alt_rep", None))
+                    if not stress_marks:
+                        ptr_word = _position_word_ptr(entries, bare_word.lower())
+                        if ptr_word:
+                            stress_marks = _position_stress_marks(entries, ptr_word)
+                else:
+                    _, results_dict = search_word_index(
                         bare_word.lower(),
-                        match_keys=ptr_match_keys,
-                        search_keys=["word_ptr"],
-                        sub_search_keys=["stress_marks"]
+                        match_keys=match_keys,
+                        search_keys=["stress_marks", "translation", "skip"]
                     )
+                    stress_marks = results_dict.get("stress_marks", None)
+                    if not stress_marks:
+                        ptr_match_keys = {"hash": current_hash, "index": i}
+                        stress_marks, _ = search_word_index(
+                            bare_word.lower(),
+                            match_keys=ptr_match_keys,
+                            search_keys=["word_ptr"],
+                            sub_search_keys=["stress_marks"]
+                        )
 
                 if stress_marks == "(none)":
                     stress_marks = None
@@ -2901,11 +4076,8 @@ def set_metadata(requested_hash, edit_dict):
     if not existing_metadata:
         print(f"{Fore.RED}Could not retrieve existing metadata. Save aborted!{Style.RESET_ALL}")
         return False
-    updated_metadata = {}
-    for hash, metadata in existing_metadata.items():
-        if hash != requested_hash:
-            updated_metadata[hash] = metadata
-            continue
+    metadata = existing_metadata.get(requested_hash, None)
+    if metadata is not None:
         for key, value in edit_dict.items():
             if key == "last_study_date" and value:
                 metadata["last_study_date"] = value
@@ -2922,15 +4094,18 @@ def set_metadata(requested_hash, edit_dict):
 
             else:
                 metadata[key] = value
-        updated_metadata[hash] = metadata
 
-    if not backup_metadata():
+    # a single-row update in SQLite or a journal append can't corrupt the
+    # other entries, so only the JSON file needs a full backup before it is
+    # rewritten
+    if not get_metadata_store() and not backup_metadata():
         print("Metadata cannot be saved since backup failed.")
+        # entries were edited in place, so don't trust the cached copy
+        invalidate_metadata_cache()
         return False
 
     #metadata_path = "metadata.json"
-    with open(metadata_path, "w") as f:
-        json.dump(updated_metadata, f, indent=2)
+    save_metadata(existing_metadata, changed=[requested_hash])
     return True
 
 def edit_metadata(hash_substring):
@@ -2999,32 +4174,59 @@ def edit_metadata(hash_substring):
             print(Fore.RED + "Change aborted!" + Style.RESET_ALL)
 
 def get_hashes(full_hash):
-    hash_list = []
-    metadata = get_metadata(full_hash)
+    return list(get_text_chain(full_hash))
 
-    base_hash = None
-    while True:
-        prev_hash = metadata.get("prev_hash", None)
-        if prev_hash:
-            metadata = get_metadata(prev_hash)
-            base_hash = prev_hash
-        else:
-            break
-    if not base_hash:
-        base_hash = full_hash
-    hash_list.append(base_hash)
-    while True:
-        next_hash = metadata.get("next_hash", None)
-        if next_hash:
-            hash_list.append(next_hash)
-            metadata = get_metadata(next_hash)
+def parse_study_args(params):
+    """
+    Parses the arguments of "study" into keyword arguments for study():
+        study [<hash>] [due [<N>]] [<type>...] [type:<type>] [tag:<tag>]
+    Word types can be given in full or abbreviated ("verb" or "v"); several
+    types or tags study words of any of them. A word that starts a text's
+    hash is taken as the hash even if it is also a type abbreviation ("ad").
+    "due" reviews the N (default: review_count) words due the longest; a
+    number right after it is N unless it starts a hash.
+    The current language's name is ignored, so "study japanese verb" works too.
+    Returns None if an argument is invalid.
+    """
+    args = {}
+    include_filters = {}
+    params = iter(params)
+    for param in params:
+        key, sep, value = param.partition(":")
+        if param == "due" and "due" not in args:
+            args["due"] = review_count
+            param = next(params, None)
+            if param is None:
+                break
+            if param.isdigit() and not find_hashes(param):
+                args["due"] = int(param)
+                continue
+            key, sep, value = param.partition(":")
+        if sep and key == "tag" and value:
+            include_filters.setdefault("tags", []).append(value)
+        elif sep and key == "type" and value:
+            include_filters.setdefault("types", []).append(abbrev_wordtype(value))
+        elif sep:
+            print(f"Invalid argument '{param}'.")
+            return None
+        elif param.lower() == current_language:
+            continue
+        elif "short_hash" not in args and find_hashes(param):
+            args["short_hash"] = param
+        elif abbrev_wordtype(param) != param or unabbrev_wordtype(param) != param:
+            include_filters.setdefault("types", []).append(abbrev_wordtype(param))
+        elif "short_hash" not in args:
+            args["short_hash"] = param
         else:
-            break
-    return hash_list
+            print(f"Invalid argument '{param}'.")
+            return None
+    if include_filters:
+        args["include_filters"] = include_filters
+    return args
 
-def study(short_hash=None, rev_study=False, lang_map=None):
+def study(short_hash=None, rev_study=False, lang_map=None, include_filters={}, due=None):
 
-    global current_hash, GLOBAL_WORD_INDEX, glob_words_index_lang, glob_words_index_count
+    global current_hash, GLOBAL_WORD_INDEX, glob_words_index_lang
 
     backup_present = {}
     hash_list = []
@@ -3038,25 +4240,22 @@ def study(short_hash=None, rev_study=False, lang_map=None):
     if not index_words(language):
         return False
 
-    all_words_dict = get_word_data(
-        hash_list=hash_list,
-        randomize=True,
-        exclude_filters={"translation": ""},
-        alt=True
-    )
-    all_words = all_words_dict["all_words"]
-    all_hashes = all_words_dict["all_hashes"]
-    all_list_inxs = all_words_dict["all_list_inxs"]
-    #all_word_inxs = all_words_dict["all_word_inxs"]
-    #all_sent_inxs = all_words_dict["all_sent_inxs"]
-
-    #all_words, all_hashes, all_list_inxs, _, _ = get_word_hash_inx_list(
-        #hash_list=hash_list,
-        #randomize=True,
-        #exclude_filters={"translation": ""}
-    #)
-
-    if not all_words:
+    if due:
+        study_queue = iter_due_words(due, hash_list=hash_list, include_filters=include_filters)
+    else:
+        # the queue is streamed, so the first word is shown as soon as its block
+        # of texts is read instead of after a pass over the whole index
+        study_queue = iter_word_data(
+            hash_list=hash_list,
+            randomize=True,
+            translated_only=True,
+            include_filters=include_filters
+        )
+    first = next(study_queue, None)
+    if first is None and due:
+        print("No words are due for review.")
+        return True
+    if first is None:
         print("No translations found. Please edit the text or the language.")
         return True
 
@@ -3066,8 +4265,6 @@ def study(short_hash=None, rev_study=False, lang_map=None):
         editable_word_keys.append("alt_representation")
 
     words_studied = {}
-    for hash in set(all_hashes):
-        words_studied[hash] = 0
 
     if IS_DEV_MODE:
         print(f"{Fore.RED}[DEV-DATA]{Style.RESET_ALL}")
@@ -3076,7 +4273,7 @@ def study(short_hash=None, rev_study=False, lang_map=None):
     next_word = False
     dupes_to_skip = []
     last_hash = None
-    for word, full_hash, index in zip(all_words, all_hashes, all_list_inxs):
+    for word, full_hash, index, _, _ in chain([first], study_queue):
 
         current_hash = full_hash
 
@@ -3088,8 +4285,7 @@ def study(short_hash=None, rev_study=False, lang_map=None):
             text_sents_file = os.path.join(text_sents_dir, current_language, f"{full_hash}.json")
             text_sents_list = None
             try:
-                with open(text_sents_file, 'r', encoding='utf-8') as f:
-                    text_sents_list = json.load(f)
+                text_sents_list = load_json(text_sents_file)
             except FileNotFoundError:
                 err_msg = "Error in {}: {} not found."
                 print(err_msg.format("".join(["stu","dy"]), text_sents_file))
@@ -3101,8 +4297,7 @@ def study(short_hash=None, rev_study=False, lang_map=None):
                 #if try_count >= 2:
                     #break
             try:
-                with open(word_filepath, "r", encoding="utf-8") as f:
-                    new_words_data = json.load(f)
+                new_words_data = load_json(word_filepath)
                     #break
             except FileNotFoundError:
                 #try_count += 1
@@ -3113,10 +4308,10 @@ def study(short_hash=None, rev_study=False, lang_map=None):
 
         if not skip_word and not next_word:
             # TODO make this a user setting
-            if words_studied[full_hash] == 5:
+            if words_studied.get(full_hash, 0) == 5:
                 # consider this a study session
                 set_metadata(full_hash, {"study_count_up": True, "last_study_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-            words_studied[full_hash] += 1
+            words_studied[full_hash] = words_studied.get(full_hash, 0) + 1
         skip_word = False
         next_word = False
         word_data = new_words_data[word][index]
@@ -3180,11 +4375,13 @@ def study(short_hash=None, rev_study=False, lang_map=None):
                         indices,
                         orig_sent=formatted_sentence,
                         rev_study=rev_study,
-                        colors=[Fore.BLACK, Fore.WHITE]
+                        colors=[Fore.BLACK, Fore.WHITE],
+                        sent_inx=word_data.get("sent_inx", None)
                     )
                 sentence = colour_sentence(sentence, word, indices,
                                            add_stress_marks=False if alt_representation_required else True,
-                                           rev_study=rev_study)
+                                           rev_study=rev_study,
+                                           sent_inx=word_data.get("sent_inx", None))
                 if native_sent:
                     native_sent = f"\n{Fore.GREEN}>{Style.RESET_ALL} " + colour_sentence(
                         native_sent, word, indices,
@@ -3192,7 +4389,8 @@ def study(short_hash=None, rev_study=False, lang_map=None):
                         rev_study=True,
                         colors=[Fore.BLACK, Fore.BLUE],
                         add_stress_marks=False,
-                        space_char="/"
+                        space_char="/",
+                        sent_inx=word_data.get("sent_inx", None)
                     )
                     native_sent = native_sent.replace(format_delim_word, " ")
 
@@ -3452,6 +4650,8 @@ def study(short_hash=None, rev_study=False, lang_map=None):
                         if alt_answers:
                             answers_output += f'\nOther answer(s): {", ".join(alt_answers)}'
 
+                    # SM-2 quality of the answer: 4 if right, 3 if right after a hint, 1 if wrong
+                    quality = 3 if hint_len else 4
                     if not rev_study and any(user_input.lower() == translation for translation in possible_answers):
                         print(Fore.GREEN + "Correct!" + Style.RESET_ALL)
                         print(f"Acceptable answer(s): {answers_output}")
@@ -3461,6 +4661,7 @@ def study(short_hash=None, rev_study=False, lang_map=None):
                     elif rev_study and lang_map and user_input.lower() == map_input(word.lower(), lang_map):
                         print(Fore.GREEN + f"Correct! The word is {word.lower()}" + Style.RESET_ALL)
                     else:
+                        quality = 1
                         print(Fore.RED + "Incorrect." + Style.RESET_ALL)
                         print(f"Acceptable answer(s): {answers_output}")
                         typed_word = input(f"{Fore.RED}Please type the word, or hit enter to continue:{Style.RESET_ALL} ")
@@ -3468,6 +4669,7 @@ def study(short_hash=None, rev_study=False, lang_map=None):
                             print(f"{Fore.RED}Try again next time!{Style.RESET_ALL}")
                         else:
                             print(f"{Fore.GREEN}Good!{Style.RESET_ALL}")
+                    get_review_store(reverse=rev_study).grade(word, quality)
                     graded = True
 
             elif (not rev_study and ("translation" not in word_data or word_data["translation"] == "")
@@ -3541,14 +4743,15 @@ def study(short_hash=None, rev_study=False, lang_map=None):
 
             if save_required:
                 # let's only backup a file once per session
-                if not backup_present.get("hash", "") and not backup_text_words(full_hash, word_filepath):
+                if not backup_present.get(full_hash, "") and not backup_text_words(full_hash, word_filepath):
                     print("Word data cannot be saved since backup failed.")
                     continue
 
                 try:
-                    with open(word_filepath, "w", encoding="utf-8") as f:
-                        json.dump(new_words_data, f, indent=2)
-                        backup_present[full_hash] = True
+                    save_json(word_filepath, new_words_data)
+                    backup_present[full_hash] = True
+                    set_word_counts(full_hash, new_words_data, flush=False)
+                    update_word_index(full_hash, new_words_data, word_filepath)
                 except (FileNotFoundError, json.JSONDecodeError) as e:
                     print(f"Error saving word data: {e}")
 
@@ -3589,37 +4792,48 @@ def create_phrase(words_data, words_in_sentence, word_index, sentence, sent_inx=
         print("Invalid phrase length.")
         return False, False
 
-def manage_backups():
+def _legacy_backup_entries():
     """
-    Scans the backup folders and checks if there are more than 10 backup files for any file.
-    If so, it deletes the old backups, and leaves the 10 newest ones in place.
+    Collects the old-style backups (full timestamped copies) as catalog
+    entries. Only runs until the backup catalog exists.
     """
-    text_backup_dir = os.path.join(text_words_dir, "backups")
-    text_files = []
-    text_files.append((backups_dir, "metadata.json"))
-    for langdir in os.listdir(text_words_dir):
-        if "backup" in langdir:
+    entries = []
+    sources = [(backups_dir, "metadata_", lambda name: name.split("_")[0] + name[name.index("."):]),
+               (os.path.join(text_words_dir, "backups"), "", lambda name: f"text_words/{name.split('_')[0]}.json")]
+    for backup_dir, prefix, source_name in sources:
+        if not os.path.isdir(backup_dir):
             continue
-        for i in os.listdir(os.path.join(text_words_dir, langdir)):
-            text_files.append((text_backup_dir, i))
-
-    files_to_delete = []
-    for backup_dir, filename in text_files:
-        if filename.endswith(".json"):
-            file_start = filename.split(".")[0]
-            backup_files = [f for f in os.listdir(backup_dir) if f.startswith(file_start) and f.endswith(".json")]
-
-            if len(backup_files) > 10:
-                backup_files.sort(key=lambda x: os.path.getctime(os.path.join(backup_dir, x)), reverse=True)  # Sort by creation time (newest first)
-                files_to_delete.extend([(backup_dir, bf) for bf in backup_files[10:]])
-
-    if files_to_delete and len(files_to_delete) > 10:
-        for backup_dir, file in files_to_delete:
-            file_path = os.path.join(backup_dir, file)
+        for name in os.listdir(backup_dir):
+            stem, ext = os.path.splitext(name)
+            if not name.startswith(prefix) or ext not in (".json", ".db") or "_" not in stem:
+                continue
             try:
-                os.remove(file_path)
-            except OSError as e:
-                print(f"Error deleting {file_path}: {e}")
+                timestamp = datetime.strptime(stem.rsplit("_", 1)[1], "%Y%m%d%H%M%S")
+            except ValueError:
+                continue
+            path = os.path.join(backup_dir, name)
+            entries.append({
+                "source": source_name(name),
+                "path": path,
+                "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                "size": os.path.getsize(path)
+            })
+    return entries
+
+def manage_backups():
+    """
+    Keeps the 10 newest backups per file and deletes the rest.
+    Retention is computed from the backup catalog, so no backup directory is
+    scanned; the old-style backup folders are read once to add their copies
+    to the catalog. Pruning runs in a background thread.
+    """
+    store = get_backup_store()
+    try:
+        if not store.has_catalog():
+            store.add_legacy(_legacy_backup_entries())
+        return store.prune_in_background()
+    except OSError as e:
+        print(f"Error pruning backups: {e}")
 
 def show_langdata(language):
     lang_data = get_langdata(language, user_friendly=True)
@@ -3629,7 +4843,6 @@ def show_langdata(language):
 def repl():
     global current_language
     global GLOBAL_WORD_INDEX, glob_words_index_lang
-    global default_words_index_count, glob_words_index_count
     global valid_commands
     global default_sent_delims, sent_delims
     global default_sent_post_delims, sent_post_delims
@@ -3646,6 +4859,7 @@ def repl():
     global default_all_letter, all_letter
     global default_alphabet, alphabet
     global default_frequents, frequents
+    global default_frequent_rank, frequent_rank
     global format_delim_phrase, format_delim_word
     global gr_prompt
 
@@ -3654,11 +4868,10 @@ def repl():
     format_delim_word = "__hs__"
     GLOBAL_WORD_INDEX = None
     glob_words_index_lang = None
-    glob_words_index_count = 5
     gr_prompt = f"{Fore.GREEN + '>' + Style.RESET_ALL}"
 
-    valid_commands = {"import", "fix_metadata", "metadata", "md", #"parse_text",
-                      "list_metadata", "list", "show", "read", "rev_study",
+    valid_commands = {"import", "fix_metadata", "metadata", "md", "metadata_db", #"parse_text",
+                      "list_metadata", "list", "show", "read", "rev_study", "xlate", "paradigm", "freq",
                       "encode", "decode", "edit", "study", #"parse_sentences",
                       "lang", "show_langdata", "help", "exit", "q", "quit"}
     sent_delims = '.!?\\n'
@@ -3695,8 +4908,8 @@ def repl():
         "v": "v", "w": "w", "x": "x", "y": "y", "z": "z"
     }
     frequents = None
+    frequent_rank = None
 
-    default_words_index_count = glob_words_index_count
     default_sent_delims = sent_delims
     default_sent_post_delims = sent_post_delims
     default_word_delims = word_delims
@@ -3712,6 +4925,7 @@ def repl():
     default_all_letter = all_letter
     default_alphabet = alphabet
     default_frequents = frequents
+    default_frequent_rank = frequent_rank
 
     print("\nWelcome to the langwich REPL.")
     print("Type 'help' for a list of available commands. Type 'exit' to quit.")
@@ -3726,6 +4940,15 @@ def repl():
             continue
 
         if command in ["quit", "exit", "q"]:
+            flush_metadata()
+            flush_word_index()
+            flush_reviews()
+            # keep metadata.json current for tools and deployments that read it
+            store = get_metadata_store()
+            if isinstance(store, MetadataJournal):
+                store.compact()
+            elif store:
+                metadata_db("export")
             print("Exiting...")
             break
 
@@ -3807,16 +5030,36 @@ def repl():
                 print("Please choose a language first (e.g. 'lang japanese')")
                 continue
             params = command.split(" ")
-            filter = None
-            limit = None
-            if len(params) >= 2:
-                filter = params[1]
-            if len(params) >= 3:
-                try:
-                    limit = int(params[2])
-                except ValueError:
-                    limit = None
-            list_texts(filter, limit)
+            if "--recount" in params:
+                params.remove("--recount")
+                recount_word_counts()
+            query = parse_list_args(params[1:])
+            if query is None:
+                continue
+            list_texts(**query)
+
+        # Show the words of all languages that share a translation
+        elif command.startswith("xlate "):
+            show_translations(command.split(" ", 1)[1])
+        elif command == "xlate":
+            print("Error: Please provide a translation after the 'xlate' command. For example: 'xlate chair'")
+
+        # Show the most frequent words of the current language
+        elif command == "freq" or command.startswith("freq "):
+            if not current_language:
+                print("Please choose a language first (e.g. 'lang japanese')")
+                continue
+            freq_params = command.split()[1:]
+            if freq_params and not freq_params[0].isdigit():
+                print("Error: Please provide a number of words. For example: 'freq 50'")
+                continue
+            show_frequencies(int(freq_params[0]) if freq_params else 20)
+
+        # List all forms of a word's base
+        elif command.startswith("paradigm "):
+            show_paradigm(command.split(" ", 1)[1].strip())
+        elif command == "paradigm":
+            print("Error: Please provide a word after the 'paradigm' command. For example: 'paradigm мати'")
 
         # Show the full text of a specified text
         elif command.startswith("show "):
@@ -3851,12 +5094,19 @@ def repl():
             edit_text = Text(hash)
             #print(edit_text)
             edit(edit_text=edit_text, randomize=randomize)
+            flush_metadata()
         elif command == "edit":
             # TODO maybe move this check way up. Compare command to a list of cmds that require a lang
             if not current_language:
                 print("Please choose a language first (e.g. 'lang japanese')")
                 continue
             edit(randomize=True)
+            flush_metadata()
+
+        # Migrate metadata.json into SQLite, or export it back to JSON
+        elif command.startswith("metadata_db"):
+            params = command.split(" ")
+            metadata_db(params[1] if len(params) > 1 else None)
 
         # Edit metadata for the specified text
         elif command.startswith("metadata ") or command.startswith("md "):
@@ -3870,13 +5120,19 @@ def repl():
             if not current_language:
                 print("Please choose a language first (e.g. 'lang japanese')")
                 continue
-            param = command.split(" ")[1]
-            study(hash_substring=param)
+            study_args = parse_study_args(command.split()[1:])
+            if study_args is None:
+                continue
+            study(**study_args)
+            flush_metadata()
+            flush_reviews()
         elif command == "study":
             if not current_language:
                 print("Please choose a language first (e.g. 'lang japanese')")
                 continue
             study()
+            flush_metadata()
+            flush_reviews()
 
         # Enter reverse study mode for the specified text
         elif command.startswith("rev_study "):
@@ -3893,6 +5149,8 @@ def repl():
                     print(f"Error: Language file '{lang_file}' not found.")
                     return
             study(hash_substring, rev_study=True, lang_map=lang_map)
+            flush_metadata()
+            flush_reviews()
         elif command == "rev_study":
             print("Error: Please provide a hash substring after the 'rev_study' command. For example: 'rev_study 124356'")
 
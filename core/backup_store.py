@@ -0,0 +1,202 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+class BackupStore:
+    """
+    Content-addressed backup store.
+
+    Each backed-up file is stored once as a gzip blob named after the SHA-256
+    of its content. catalog.jsonl records every backup when it is written
+    (source name, blob, timestamp and size), so retention can be computed
+    without scanning any directory. Backing up unchanged content writes
+    nothing, and prune() deletes blobs that no kept entry points to.
+
+    Old-style full copies can be recorded with add_legacy(); prune() then
+    deletes them like any other backup.
+    """
+    def __init__(self, root_dir, keep=10):
+        """
+        :param root_dir: directory holding the blobs/ dir and catalog.jsonl
+        :param keep: number of backups kept per source by prune()
+        """
+        self.root_dir = str(root_dir)
+        self.blobs_dir = os.path.join(self.root_dir, "blobs")
+        self.catalog_path = os.path.join(self.root_dir, "catalog.jsonl")
+        self.keep = keep
+        self._catalog = None
+        self._last_blob = {}
+        self._lock = threading.Lock()
+
+    def has_catalog(self):
+        return os.path.exists(self.catalog_path)
+
+    def _load(self):
+        if self._catalog is not None:
+            return
+        self._catalog = []
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._catalog.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            self._import_refs()
+        for entry in self._catalog:
+            if "blob" in entry:
+                self._last_blob[entry["source"]] = entry["blob"]
+
+    def _import_refs(self):
+        # refs.json was the index before catalog.jsonl existed
+        refs_path = os.path.join(self.root_dir, "refs.json")
+        try:
+            with open(refs_path, "r", encoding="utf-8") as f:
+                refs = json.load(f)
+        except FileNotFoundError:
+            return
+        for source, source_refs in refs.items():
+            for ref in source_refs:
+                blob_path = self.blob_path(ref["blob"])
+                size = os.path.getsize(blob_path) if os.path.exists(blob_path) else 0
+                self._catalog.append({"source": source, "blob": ref["blob"],
+                                      "timestamp": ref["timestamp"], "size": size})
+        self._write_catalog()
+        os.remove(refs_path)
+
+    def _append(self, entry):
+        os.makedirs(self.root_dir, exist_ok=True)
+        with open(self.catalog_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._catalog.append(entry)
+
+    def _write_catalog(self):
+        os.makedirs(self.root_dir, exist_ok=True)
+        tmp_path = self.catalog_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._catalog:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.catalog_path)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest + ".gz")
+
+    def backup(self, source, filepath):
+        """
+        Backs up filepath under the name "source". Returns True if a new
+        backup was recorded, False if the content is the same as the last one.
+        """
+        with open(filepath, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            self._load()
+            if self._last_blob.get(source, None) == digest:
+                return False
+
+            blob_path = self.blob_path(digest)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = blob_path + ".tmp"
+                with gzip.open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, blob_path)
+
+            self._append({
+                "source": source,
+                "blob": digest,
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "size": len(content)
+            })
+            self._last_blob[source] = digest
+        return True
+
+    def add_legacy(self, entries):
+        """
+        Records old-style backup copies, given as dicts with "source", "path",
+        "timestamp" and "size", and creates the catalog if it doesn't exist.
+        """
+        with self._lock:
+            self._load()
+            for entry in entries:
+                self._catalog.append(entry)
+            self._write_catalog()
+
+    def list_backups(self, source):
+        """Returns the catalog entries of a source, oldest first."""
+        with self._lock:
+            self._load()
+            return sorted((e for e in self._catalog if e["source"] == source),
+                          key=lambda e: e["timestamp"])
+
+    def restore(self, source, dest_path, version=-1):
+        """Writes a backed-up version (default: the latest) of source to dest_path."""
+        entries = self.list_backups(source)
+        if not entries:
+            raise FileNotFoundError(f"No backups for '{source}'")
+        entry = entries[version]
+        if "blob" in entry:
+            with gzip.open(self.blob_path(entry["blob"]), "rb") as f:
+                content = f.read()
+        else:
+            with open(entry["path"], "rb") as f:
+                content = f.read()
+        with open(dest_path, "wb") as f:
+            f.write(content)
+
+    def prune(self):
+        """
+        Keeps the newest "keep" backups per source, deletes blobs that are no
+        longer referenced and old-style copies that were dropped. Returns the
+        number of files deleted.
+        """
+        with self._lock:
+            self._load()
+            by_source = {}
+            for entry in self._catalog:
+                by_source.setdefault(entry["source"], []).append(entry)
+            kept = []
+            dropped = []
+            for entries in by_source.values():
+                entries.sort(key=lambda e: e["timestamp"])
+                kept.extend(entries[-self.keep:])
+                dropped.extend(entries[:-self.keep])
+            if not dropped:
+                return 0
+            self._catalog = kept
+            self._write_catalog()
+            ref_counts = {}
+            for entry in kept:
+                if "blob" in entry:
+                    ref_counts[entry["blob"]] = ref_counts.get(entry["blob"], 0) + 1
+
+            # blobs are deleted under the lock: a concurrent backup() of the
+            # same content would otherwise find the blob, skip writing it and
+            # record an entry pointing to a file that is then removed
+            removed = 0
+            for entry in dropped:
+                if "blob" in entry:
+                    if ref_counts.get(entry["blob"], 0):
+                        continue
+                    path = self.blob_path(entry["blob"])
+                    # several dropped entries may share a blob
+                    ref_counts[entry["blob"]] = -1
+                else:
+                    path = entry["path"]
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def prune_in_background(self):
+        """Runs prune() in a thread and returns the thread."""
+        thread = threading.Thread(target=self.prune)
+        thread.start()
+        return thread
@@ -0,0 +1,35 @@
+import json
+
+# orjson is optional; it parses and writes JSON several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(data, compact=True, default=None):
+    """
+    Encodes data as UTF-8 JSON bytes. Compact output has no whitespace and
+    keeps non-ASCII characters as they are; otherwise it is indented by 2
+    like json.dump(data, f, indent=2). default converts objects JSON has no
+    type for, as in json.dumps().
+    """
+    if orjson is not None:
+        option = None if compact else orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=option)
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+    return json.dumps(data, indent=2, default=default).encode("utf-8")
+
+def loads(content):
+    """Decodes JSON bytes or str, compact or indented."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def dump(data, path, compact=True, default=None):
+    with open(path, "wb") as f:
+        f.write(dumps(data, compact, default))
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
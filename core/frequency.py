@@ -0,0 +1,93 @@
+import os
+
+from langwich.core import codec
+
+def word_frequencies(parsed_text):
+    """Returns {word: occurrences} of a text_words dict, leaving out skipped words."""
+    counts = {}
+    for word, meanings in parsed_text.items():
+        count = sum(1 for meaning in meanings if not meaning.get("skip", False))
+        if count:
+            counts[word] = count
+    return counts
+
+class FrequencyTable:
+    """
+    Word frequencies of one language's corpus.
+
+    Keeps every text's word counts, so a text can be replaced or removed
+    without recounting the others, along with the totals: occurrences per
+    word ("counts") and the number of texts a word appears in ("docs").
+    Ranks (1 = most frequent) are computed when first asked for after a change.
+    """
+    def __init__(self, path):
+        """
+        :param path: JSON file the table is loaded from and saved to
+        """
+        self.path = str(path)
+        self.texts = {}
+        self.counts = {}
+        self.docs = {}
+        self.dirty = False
+        self._ranks = None
+
+    def load(self):
+        """Loads the saved table. Returns False if there is none."""
+        try:
+            data = codec.load(self.path)
+        except (FileNotFoundError, ValueError):
+            return False
+        self.texts = data.get("texts", {})
+        self.counts = data.get("counts", {})
+        self.docs = data.get("docs", {})
+        self.dirty = False
+        self._ranks = None
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        codec.dump({"counts": self.counts, "docs": self.docs, "texts": self.texts}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def _add(self, word_counts, sign):
+        for word, count in word_counts.items():
+            self.counts[word] = self.counts.get(word, 0) + sign*count
+            self.docs[word] = self.docs.get(word, 0) + sign
+            if self.counts[word] <= 0:
+                del self.counts[word]
+                del self.docs[word]
+
+    def set_text(self, text_hash, word_counts):
+        """Replaces the counts of a text ({word: occurrences})."""
+        if self.texts.get(text_hash, None) == word_counts:
+            return
+        self._add(self.texts.get(text_hash, {}), -1)
+        self._add(word_counts, 1)
+        self.texts[text_hash] = word_counts
+        self.dirty = True
+        self._ranks = None
+
+    def remove_text(self, text_hash):
+        if text_hash in self.texts:
+            self._add(self.texts.pop(text_hash), -1)
+            self.dirty = True
+            self._ranks = None
+
+    def ranks(self):
+        """Returns {word: rank}; ties are ranked alphabetically."""
+        if self._ranks is None:
+            ordered = sorted(self.counts, key=lambda w: (-self.counts[w], w))
+            self._ranks = {word: rank for rank, word in enumerate(ordered, start=1)}
+        return self._ranks
+
+    def rank(self, word):
+        """Returns the rank of word, or None if it is not in the corpus."""
+        return self.ranks().get(word, None)
+
+    def top(self, n):
+        """Returns the n most frequent words as (word, count, docs)."""
+        ranks = self.ranks()
+        words = sorted(ranks, key=ranks.get)[:n]
+        return [(word, self.counts[word], self.docs[word]) for word in words]
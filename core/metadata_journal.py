@@ -0,0 +1,163 @@
+import os
+import threading
+
+from langwich.core import codec
+
+class MetadataJournal:
+    """
+    Keeps metadata as a JSON snapshot plus an append-only journal.
+
+    Every write appends one line per changed text to "<snapshot>.journal.jsonl"
+    instead of rewriting the snapshot. Reading replays the journal over the
+    snapshot. compact() folds the journal into a new snapshot.
+
+    Records hold whole metadata entries ({"hash": ..., "put": {...}}) or
+    deletions ({"hash": ..., "delete": true}), so replaying a record twice
+    gives the same result. That lets compaction run in a background thread
+    while new records go to a fresh journal.
+    """
+    def __init__(self, snapshot_path, max_journal_size=1024*1024, compact_json=True):
+        """
+        :param snapshot_path: path of the metadata.json snapshot
+        :param max_journal_size: journal size in bytes that triggers a
+                                 background compaction
+        :param compact_json: write the snapshot without whitespace (see
+                             codec.dumps()); otherwise it is indented by 2
+        """
+        # resolve symlinks (deployments link metadata.json into a shared dir)
+        # so the journal and temp files live next to the real snapshot
+        self.snapshot_path = os.path.realpath(str(snapshot_path))
+        base, _ = os.path.splitext(self.snapshot_path)
+        self.journal_path = base + ".journal.jsonl"
+        self.compacting_path = base + ".journal.compacting.jsonl"
+        self.max_journal_size = max_journal_size
+        self.compact_json = compact_json
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def _file_stamp(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def stamp(self):
+        """Returns a value that changes whenever any backing file changes."""
+        stamps = tuple(self._file_stamp(p) for p in
+                       (self.snapshot_path, self.compacting_path, self.journal_path))
+        return None if stamps == (None, None, None) else stamps
+
+    def has_journal(self):
+        return os.path.exists(self.journal_path) or os.path.exists(self.compacting_path)
+
+    def _read_snapshot(self):
+        try:
+            return codec.load(self.snapshot_path)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _replay(metadata, journal_path):
+        try:
+            with open(journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = codec.loads(line)
+                    except ValueError:
+                        # torn last line after a crash; everything before it is intact
+                        continue
+                    if record.get("delete", False):
+                        metadata.pop(record["hash"], None)
+                    else:
+                        metadata[record["hash"]] = record["put"]
+        except FileNotFoundError:
+            pass
+
+    def get_all(self):
+        """Returns the snapshot with all journal records applied."""
+        if self.stamp() is None:
+            raise FileNotFoundError(self.snapshot_path)
+        with self._lock:
+            metadata = self._read_snapshot()
+            self._replay(metadata, self.compacting_path)
+            self._replay(metadata, self.journal_path)
+        return metadata
+
+    def _append(self, records):
+        # records are always compact: one record per line
+        lines = b"".join(codec.dumps(record) + b"\n" for record in records)
+        with self._lock:
+            with open(self.journal_path, "ab+") as f:
+                # end a line torn by a crash, so it doesn't swallow the first new record
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        lines = b"\n" + lines
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.getsize(self.journal_path) > self.max_journal_size:
+            self.compact(background=True)
+
+    def put_many(self, entries):
+        self._append([{"hash": h, "put": m} for h, m in entries.items()])
+
+    def put(self, hash, metadata):
+        self.put_many({hash: metadata})
+
+    def delete_many(self, hashes):
+        self._append([{"hash": h, "delete": True} for h in hashes])
+
+    def _write_snapshot(self, metadata):
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(codec.dumps(metadata, self.compact_json))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def replace_all(self, metadata):
+        """Writes a new snapshot and drops the journal."""
+        self.wait()
+        with self._lock:
+            self._write_snapshot(metadata)
+            for path in (self.compacting_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def compact(self, background=False):
+        """
+        Folds the journal into a new snapshot. In the foreground it waits for
+        a running background compaction first; in the background it leaves
+        the journal to the running one.
+        """
+        if not background:
+            self.wait()
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.journal_path):
+                    return
+                # new records go to a fresh journal while this one is folded
+                os.replace(self.journal_path, self.compacting_path)
+        if background:
+            self._thread = threading.Thread(target=self._fold)
+            self._thread.start()
+        else:
+            self._fold()
+
+    def _fold(self):
+        metadata = self._read_snapshot()
+        self._replay(metadata, self.compacting_path)
+        with self._lock:
+            self._write_snapshot(metadata)
+            os.remove(self.compacting_path)
+
+    def wait(self):
+        """Blocks until a running background compaction has finished."""
+        if self._thread:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+
+from langwich.core import codec
+
+class SqliteMetadataStore:
+    """
+    Stores text metadata in SQLite, one row per text hash.
+
+    The full metadata entry is kept as JSON in the "data" column; the fields we
+    filter or follow links on are copied into indexed columns.
+    """
+    indexed_columns = ["language", "prev_hash", "next_hash", "label", "hidden", "last_study_date"]
+
+    def __init__(self, db_path, compact_json=True):
+        """
+        :param db_path: path of the SQLite database file (created if missing)
+        :param compact_json: write export_json() files without whitespace (see
+                             codec.dumps()); otherwise they are indented by 2
+        """
+        self.db_path = str(db_path)
+        self.compact_json = compact_json
+        self._conn = None
+
+    def connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._create_schema()
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stamp(self):
+        """Returns the database file's (mtime, size), or None if it doesn't exist."""
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _create_schema(self):
+        columns = ", ".join(f"{col} {'INTEGER' if col == 'hidden' else 'TEXT'}" for col in self.indexed_columns)
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS texts (hash TEXT PRIMARY KEY, {columns}, data TEXT NOT NULL)"
+            )
+            for col in self.indexed_columns:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_texts_{col} ON texts ({col})")
+
+    def _row(self, hash, metadata):
+        row = [hash]
+        for col in self.indexed_columns:
+            value = metadata.get(col, None)
+            if col == "hidden":
+                value = 1 if value else 0
+            elif col == "language" and value:
+                value = value.lower()
+            row.append(value)
+        row.append(codec.dumps(metadata).decode("utf-8"))
+        return row
+
+    def get(self, hash):
+        """Returns the metadata dict for a hash, or None if not stored."""
+        cur = self.connect().execute("SELECT data FROM texts WHERE hash = ?", (hash,))
+        row = cur.fetchone()
+        return codec.loads(row[0]) if row else None
+
+    def get_all(self):
+        """Returns all metadata as {hash: metadata}, in insertion order."""
+        cur = self.connect().execute("SELECT hash, data FROM texts ORDER BY rowid")
+        return {hash: codec.loads(data) for hash, data in cur}
+
+    def put_many(self, entries):
+        """Inserts or updates the given {hash: metadata} rows in one transaction."""
+        cols = ["hash"] + self.indexed_columns + ["data"]
+        updates = ", ".join(f"{col} = excluded.{col}" for col in cols[1:])
+        sql = (
+            f"INSERT INTO texts ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT(hash) DO UPDATE SET {updates}"
+        )
+        conn = self.connect()
+        with conn:
+            conn.executemany(sql, [self._row(h, m) for h, m in entries.items()])
+
+    def put(self, hash, metadata):
+        self.put_many({hash: metadata})
+
+    def delete_many(self, hashes):
+        conn = self.connect()
+        with conn:
+            conn.executemany("DELETE FROM texts WHERE hash = ?", [(h,) for h in hashes])
+
+    def replace_all(self, metadata):
+        """Replaces the whole table with the given {hash: metadata} dict."""
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM texts")
+        self.put_many(metadata)
+
+    def count(self):
+        return self.connect().execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+
+    def import_json(self, json_path):
+        """One-shot migration from a metadata.json file. Returns the number of rows."""
+        metadata = codec.load(json_path)
+        self.replace_all(metadata)
+        return len(metadata)
+
+    def export_json(self, json_path):
+        """Writes all rows back out in the metadata.json format."""
+        metadata = self.get_all()
+        codec.dump(metadata, json_path, self.compact_json)
+        return len(metadata)
+
+    def backup_to(self, backup_path):
+        """Copies the database to backup_path using SQLite's online backup."""
+        dest = sqlite3.connect(str(backup_path))
+        try:
+            with dest:
+                self.connect().backup(dest)
+        finally:
+            dest.close()
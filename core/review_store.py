@@ -0,0 +1,98 @@
+import heapq
+import os
+import time
+
+from langwich.core import codec
+
+DAY = 86400
+MIN_EASE = 1.3
+START_EASE = 2.5
+
+class ReviewStore:
+    """
+    Review history and SM-2 schedule of one language's words.
+
+    Every reviewed word has a card: when it was last seen, its interval (in
+    days), ease, repetitions since its last lapse, lapses, and when it is due
+    (seconds since the epoch). The due times are kept in a min-heap, so the
+    next due words are popped without going through every card; a card that
+    is graded again gets a new heap entry and its old one is dropped when it
+    comes up.
+    """
+    def __init__(self, path):
+        """
+        :param path: JSON file the cards are loaded from and saved to
+        """
+        self.path = str(path)
+        self.cards = {}
+        self.dirty = False
+        self._heap = []
+
+    def load(self):
+        """Loads the saved cards. Returns False if there are none."""
+        try:
+            data = codec.load(self.path)
+        except (FileNotFoundError, ValueError):
+            return False
+        self.cards = data.get("cards", {})
+        self._heap = [(card["due"], word) for word, card in self.cards.items()]
+        heapq.heapify(self._heap)
+        self.dirty = False
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        codec.dump({"cards": self.cards}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def grade(self, word, quality, now=None):
+        """
+        Updates the card of word after an answer graded 0-5 as in SM-2 (below
+        3 is a lapse, 5 a perfect answer) and returns it.
+        """
+        now = time.time() if now is None else now
+        card = self.cards.get(word, None) or {"interval": 0, "ease": START_EASE, "reps": 0, "lapses": 0}
+        if quality < 3:
+            if card["reps"]:
+                card["lapses"] += 1
+            card["reps"] = 0
+            card["interval"] = 1
+        else:
+            card["reps"] += 1
+            if card["reps"] == 1:
+                card["interval"] = 1
+            elif card["reps"] == 2:
+                card["interval"] = 6
+            else:
+                card["interval"] = round(card["interval"] * card["ease"], 2)
+        card["ease"] = max(MIN_EASE, round(card["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02), 2))
+        card["last_seen"] = now
+        card["due"] = now + card["interval"] * DAY
+        self.cards[word] = card
+        heapq.heappush(self._heap, (card["due"], word))
+        self.dirty = True
+        return card
+
+    def due(self, n, now=None, keep=None):
+        """
+        Returns up to n words due by now, earliest first, leaving out words
+        keep (if given) is false for.
+        """
+        now = time.time() if now is None else now
+        words = []
+        popped = set()
+        while self._heap and len(words) < n and self._heap[0][0] <= now:
+            due, word = heapq.heappop(self._heap)
+            card = self.cards.get(word, None)
+            if not card or card["due"] != due or (due, word) in popped:
+                # superseded by a later grade
+                continue
+            popped.add((due, word))
+            if keep is None or keep(word):
+                words.append(word)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return words
+
@@ -0,0 +1,310 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, MutableMapping
+
+# File layout (all integers native 4-byte, every section 4-byte aligned):
+#   header        magic, version, byte order, n_strings, n_words, n_records
+#   str_offsets   n_strings+1 uint32 byte offsets into the string blob
+#   key_ids       n_words int32 string ids of the words, sorted
+#   key_starts    n_words+1 uint32 record positions per word
+#   columns       one int32 column of n_records values per field
+#   strings       UTF-8 string blob
+# Words, text hashes and all string values are ids into the string table.
+MAGIC = b"LWIX"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIII")
+
+INT_FIELDS = ("list_index", "index", "sent_inx")
+STR_FIELDS = ("hash", "type", "base", "translation", "base_translation",
+              "alt_representation", "special_alt_rep", "stress_marks", "tags", "word_ptr")
+# leftover keys and values that don't fit their column, as a JSON string
+COLUMNS = INT_FIELDS + STR_FIELDS + ("extra",)
+# record keys in the order index_words() creates them
+KEY_ORDER = ("word_ptr", "hash", "list_index", "index", "sent_inx", "type", "base",
+             "translation", "base_translation", "alt_representation",
+             "special_alt_rep", "stress_marks", "tags")
+
+ABSENT = -2**31
+EMPTY = -2**31 + 1  # sent_inx is "" when the meaning has none
+INT_MAX = 2**31 - 1
+
+# key tuples shared by all IndexRecords with the same keys
+_record_shapes = {}
+
+class IndexRecord(MutableMapping):
+    """
+    One occurrence of a word in the word index, used like the {key: value}
+    dict the index file holds.
+
+    The values are kept in a tuple next to a key tuple that all records with
+    the same keys (in the same order) share, and the text hash is interned,
+    so a record costs a fraction of a dict's memory. Records compare equal to
+    dicts with the same items; to_dict() gives the shape the index files use.
+    """
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, fields=()):
+        fields = dict(fields)
+        if type(fields.get("hash", None)) is str:
+            fields["hash"] = sys.intern(fields["hash"])
+        keys = tuple(fields)
+        self._keys = _record_shapes.setdefault(keys, keys)
+        self._values = tuple(fields.values())
+
+    def __reduce__(self):
+        # the shape and hash are shared again where the record is unpickled
+        return (IndexRecord, (self.to_dict(),))
+
+    def to_dict(self):
+        return dict(zip(self._keys, self._values))
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        if key in self._keys:
+            return self._values[self._keys.index(key)]
+        return default
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __setitem__(self, key, value):
+        fields = self.to_dict()
+        fields[key] = value
+        self.__init__(fields)
+
+    def __delitem__(self, key):
+        fields = self.to_dict()
+        del fields[key]
+        self.__init__(fields)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def items(self):
+        return zip(self._keys, self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"IndexRecord({self.to_dict()!r})"
+
+def write_word_index(path, word_index):
+    """Writes a {word: [record, ...]} mapping in the binary format."""
+    strings = {}
+    def string_id(value):
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    words = sorted(word_index)
+    key_ids = array("i", (string_id(word) for word in words))
+    key_starts = array("I", [0])
+    columns = {col: array("i") for col in COLUMNS}
+    for word in words:
+        records = word_index[word]
+        for record in records:
+            extra = {}
+            for key, value in record.items():
+                if key in INT_FIELDS and type(value) is int and EMPTY < value <= INT_MAX:
+                    continue
+                if key == "sent_inx" and value == "":
+                    continue
+                if key in STR_FIELDS and type(value) is str:
+                    continue
+                extra[key] = value
+            for col in INT_FIELDS:
+                value = record.get(col, ABSENT)
+                if col in extra or value is ABSENT:
+                    columns[col].append(ABSENT)
+                else:
+                    columns[col].append(EMPTY if value == "" else value)
+            for col in STR_FIELDS:
+                if col in record and col not in extra:
+                    columns[col].append(string_id(record[col]))
+                else:
+                    columns[col].append(-1)
+            columns["extra"].append(string_id(json.dumps(extra, ensure_ascii=False)) if extra else -1)
+        key_starts.append(key_starts[-1] + len(records))
+
+    blob = bytearray()
+    str_offsets = array("I", [0])
+    for value in strings:
+        blob += value.encode("utf-8")
+        str_offsets.append(len(blob))
+
+    byte_order = 0 if sys.byteorder == "little" else 1
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, byte_order, len(strings), len(words), key_starts[-1]))
+        for section in [str_offsets, key_ids, key_starts] + [columns[col] for col in COLUMNS]:
+            section.tofile(f)
+        f.write(blob)
+
+class MappedWordIndex(MutableMapping):
+    """
+    A word index file in the binary format, used like the {word: [record, ...]}
+    dict of the JSON index.
+
+    The file is memory-mapped and a word's records are decoded every time the
+    word is looked up (by bisecting the sorted key table), so reading the
+    whole index doesn't load it into memory. Only changed words are kept, in
+    an in-memory overlay: assign the changed list (index[word] = records) or
+    get it from setdefault(), whose list can be modified in place like that
+    of a dict.
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order, n_strings, n_words, n_records = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION or byte_order != (0 if sys.byteorder == "little" else 1):
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a word index this version can read")
+
+        view = self._view = memoryview(self._mm)
+        pos = HEADER.size
+        def section(count, fmt):
+            nonlocal pos
+            part = view[pos:pos + 4*count].cast(fmt)
+            pos += 4*count
+            return part
+        self._str_offsets = section(n_strings + 1, "I")
+        self._key_ids = section(n_words, "i")
+        self._key_starts = section(n_words + 1, "I")
+        self._columns = {col: section(n_records, "i") for col in COLUMNS}
+        self._blob = view[pos:]
+        self._n_words = n_words
+        self._overlay = {}
+        self._deleted = set()
+        self._added = set()
+
+    def close(self):
+        """Releases the mapping; the overlay stays usable."""
+        parts = [self._str_offsets, self._key_ids, self._key_starts, self._blob]
+        for part in parts + list(self._columns.values()) + [self._view]:
+            part.release()
+        self._columns = {}
+        self._mm.close()
+
+    def _string(self, string_id):
+        return str(self._blob[self._str_offsets[string_id]:self._str_offsets[string_id + 1]], "utf-8")
+
+    def _key(self, position):
+        return self._string(self._key_ids[position])
+
+    def _find(self, word):
+        position = bisect_left(_KeyView(self), word)
+        if position < self._n_words and self._key(position) == word:
+            return position
+        return None
+
+    def _decode(self, position):
+        records = []
+        columns = self._columns
+        for i in range(self._key_starts[position], self._key_starts[position + 1]):
+            values = {}
+            for col in INT_FIELDS:
+                value = columns[col][i]
+                if value != ABSENT:
+                    values[col] = "" if value == EMPTY else value
+            for col in STR_FIELDS:
+                value = columns[col][i]
+                if value != -1:
+                    values[col] = self._string(value)
+            if columns["extra"][i] != -1:
+                values.update(json.loads(self._string(columns["extra"][i])))
+            record = {key: values.pop(key) for key in KEY_ORDER if key in values}
+            record.update(values)
+            records.append(IndexRecord(record))
+        return records
+
+    def _base_has(self, word):
+        return word not in self._deleted and self._find(word) is not None
+
+    def __getitem__(self, word):
+        if word in self._overlay:
+            return self._overlay[word]
+        if word in self._deleted:
+            raise KeyError(word)
+        position = self._find(word)
+        if position is None:
+            raise KeyError(word)
+        return self._decode(position)
+
+    def setdefault(self, word, default=None):
+        if word not in self._overlay:
+            if self._base_has(word):
+                self._overlay[word] = self._decode(self._find(word))
+            else:
+                self[word] = default
+        return self._overlay[word]
+
+    def __setitem__(self, word, records):
+        if word not in self._overlay and self._find(word) is None:
+            self._added.add(word)
+        self._deleted.discard(word)
+        self._overlay[word] = records
+
+    def __delitem__(self, word):
+        if word not in self:
+            raise KeyError(word)
+        self._overlay.pop(word, None)
+        if word in self._added:
+            self._added.discard(word)
+        else:
+            self._deleted.add(word)
+
+    def __contains__(self, word):
+        return word in self._overlay or self._base_has(word)
+
+    def __iter__(self):
+        for position in range(self._n_words):
+            word = self._key(position)
+            if word not in self._deleted:
+                yield word
+        yield from self._added
+
+    def __len__(self):
+        return self._n_words - len(self._deleted) + len(self._added)
+
+    def items(self):
+        """Iterates (word, records), decoding the words in file order."""
+        for position in range(self._n_words):
+            word = self._key(position)
+            if word in self._overlay:
+                yield word, self._overlay[word]
+            elif word not in self._deleted:
+                yield word, self._decode(position)
+        for word in self._added:
+            yield word, self._overlay[word]
+
+    def values(self):
+        for _, records in self.items():
+            yield records
+
+class _KeyView:
+    """Sequence view of the sorted key table for bisect."""
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return self._index._n_words
+
+    def __getitem__(self, position):
+        return self._index._key(position)
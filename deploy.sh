@@ -59,7 +59,7 @@ DEPLOY_ROOT="${PARENT_DIR}/${PROJECT_NAME}${DEPLOYMENT_SUFFIX}"
 
 # Define directories that contain persistent, application-generated data.
 # These directories will be excluded from code copying and symlinked from a 'shared' location.
-USER_DATA=("backups" "text_sentences" "text_words" "texts" "words" "metadata.json")
+USER_DATA=("backups" "text_sentences" "text_words" "texts" "words" "metadata.json" "metadata.db")
 
 # Define structural directories within DEPLOY_ROOT
 RELEASES_DIR="$DEPLOY_ROOT/releases"
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from langwich.core.backup_store import BackupStore
+
+def test_unchanged_content_is_not_stored_again(tmp_path):
+    store = BackupStore(tmp_path / "store")
+    source_file = tmp_path / "metadata.json"
+    source_file.write_text('{"foo": "bar"}')
+
+    assert store.backup("metadata.json", source_file) is True
+    assert store.backup("metadata.json", source_file) is False
+    assert len(store.list_backups("metadata.json")) == 1
+
+def test_identical_content_shares_a_blob(tmp_path):
+    store = BackupStore(tmp_path / "store")
+    source_file = tmp_path / "words.json"
+    source_file.write_text('{"foo": []}')
+    store.backup("text_words/1.json", source_file)
+    store.backup("text_words/2.json", source_file)
+
+    blob_1 = store.list_backups("text_words/1.json")[0]["blob"]
+    blob_2 = store.list_backups("text_words/2.json")[0]["blob"]
+    assert blob_1 == blob_2
+
+def test_restore(tmp_path):
+    store = BackupStore(tmp_path / "store")
+    source_file = tmp_path / "metadata.json"
+    source_file.write_text('{"foo": "bar"}')
+    store.backup("metadata.json", source_file)
+    source_file.write_text('{"foo": "baz"}')
+    store.backup("metadata.json", source_file)
+
+    store.restore("metadata.json", tmp_path / "restored.json", version=0)
+    assert (tmp_path / "restored.json").read_text() == '{"foo": "bar"}'
+
+def test_prune_deletes_unreferenced_blobs(tmp_path):
+    store = BackupStore(tmp_path / "store", keep=2)
+    source_file = tmp_path / "metadata.json"
+    for i in range(4):
+        source_file.write_text(f'{{"version": {i}}}')
+        store.backup("metadata.json", source_file)
+    oldest_blob = store.list_backups("metadata.json")[0]["blob"]
+
+    assert store.prune() == 2
+    assert len(store.list_backups("metadata.json")) == 2
+    assert not os.path.exists(store.blob_path(oldest_blob))
+
+def test_catalog_is_read_back(tmp_path):
+    source_file = tmp_path / "metadata.json"
+    source_file.write_text('{"foo": "bar"}')
+    BackupStore(tmp_path / "store").backup("metadata.json", source_file)
+
+    store = BackupStore(tmp_path / "store")
+    backups = store.list_backups("metadata.json")
+    assert backups[0]["size"] == len('{"foo": "bar"}')
+    assert store.backup("metadata.json", source_file) is False
+
+def test_prune_deletes_legacy_copies(tmp_path):
+    store = BackupStore(tmp_path / "store", keep=1)
+    legacy_files = []
+    for i in range(3):
+        path = tmp_path / f"metadata_2024010100000{i}.json"
+        path.write_text("{}")
+        legacy_files.append(path)
+    store.add_legacy([{"source": "metadata.json", "path": str(p),
+                       "timestamp": f"2024-01-01 00:00:0{i}", "size": 2}
+                      for i, p in enumerate(legacy_files)])
+
+    store.prune_in_background().join()
+    assert [p.exists() for p in legacy_files] == [False, False, True]
+
+def test_backup_during_prune_keeps_its_blob(tmp_path, monkeypatch):
+    store = BackupStore(tmp_path / "store", keep=1)
+    source_file = tmp_path / "metadata.json"
+    source_file.write_text('{"version": 0}')
+    store.backup("metadata.json", source_file)
+    source_file.write_text('{"version": 1}')
+    store.backup("metadata.json", source_file)
+
+    # back up the content being pruned while prune() deletes its blob
+    other_file = tmp_path / "other.json"
+    other_file.write_text('{"version": 0}')
+    remove = os.remove
+    started = threading.Event()
+    def slow_remove(path):
+        started.set()
+        time.sleep(0.2)
+        remove(path)
+    monkeypatch.setattr("langwich.core.backup_store.os.remove", slow_remove)
+    pruning = store.prune_in_background()
+    started.wait()
+    store.backup("other.json", other_file)
+    pruning.join()
+
+    store.restore("other.json", tmp_path / "restored.json")
+    assert (tmp_path / "restored.json").read_text() == '{"version": 0}'
@@ -1,3 +1,6 @@
+import pytest
+import json
+from array import array
 import langwich.cli
 from langwich.cli import get_metadata, get_hashes
 
@@ -57,3 +60,705 @@ def test_get_hashes_linked_reverse_long(monkeypatch):
     assert hash_list[2] == "12350"
     assert hash_list[3] == "12351"
     assert hash_list[4] == "12352"
+
+def test_get_metadata_is_cached(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"abcde": {"foo": "bar"}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    langwich.cli.invalidate_metadata_cache()
+
+    loads = []
+    orig_load = langwich.cli.load_json
+    def counting_load(path):
+        loads.append(path)
+        return orig_load(path)
+    monkeypatch.setattr(langwich.cli, "load_json", counting_load)
+
+    get_metadata("abcde")
+    get_metadata("abcde")
+
+    assert len(loads) == 1
+
+def test_get_metadata_reloads_on_change(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"abcde": {"foo": "bar"}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    langwich.cli.invalidate_metadata_cache()
+
+    assert get_metadata("abcde") == {"foo": "bar"}
+    md_file.write_text('{"abcde": {"foo": "bazz"}}')
+
+    assert get_metadata("abcde") == {"foo": "bazz"}
+
+def test_update_metadata_refreshes_cache(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"abcde": {"foo": "bar"}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    langwich.cli.invalidate_metadata_cache()
+
+    langwich.cli.update_metadata("12345", {"foo": "baz"})
+
+    assert get_metadata("12345") == {"foo": "baz"}
+    assert '"12345"' in md_file.read_text()
+
+def test_set_metadata_with_sqlite_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(langwich.cli, "metadata_db_path", tmp_path / "metadata.db")
+    monkeypatch.setattr(langwich.cli, "metadata_backend", "sqlite")
+    langwich.cli.invalidate_metadata_cache()
+    langwich.cli.get_metadata_store().import_json("./tests/data/metadata.json")
+
+    assert langwich.cli.set_metadata("12345", {"study_count_up": True})
+    langwich.cli.invalidate_metadata_cache()
+
+    assert get_metadata("12345") == {"study_count": 1}
+    assert get_hashes("12347") == ["12346", "12347"]
+
+def test_set_metadata_with_journal_backend(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"12345": {"study_count": 2}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "metadata_backend", "journal")
+    langwich.cli.invalidate_metadata_cache()
+
+    assert langwich.cli.set_metadata("12345", {"study_count_up": True})
+    langwich.cli.invalidate_metadata_cache()
+
+    assert get_metadata("12345") == {"study_count": 3}
+    assert md_file.read_text() == '{"12345": {"study_count": 2}}'
+
+def test_auto_backend_is_resolved_once(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"12345": {"study_count": 2}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "metadata_db_path", tmp_path / "metadata.db")
+    monkeypatch.setattr(langwich.cli, "metadata_backend", "auto")
+    langwich.cli.invalidate_metadata_cache()
+    checks = []
+    monkeypatch.setattr(langwich.cli.MetadataJournal, "has_journal", lambda self: checks.append(1) or False)
+
+    for _ in range(3):
+        assert get_metadata("12345") == {"study_count": 2}
+    assert len(checks) == 1
+
+def test_metadata_json_format_is_the_same_on_every_path(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "metadata_db_path", tmp_path / "metadata.db")
+    metadata = {"12345": {"title": "čaj", "study_count": 2}}
+
+    for json_format in ("compact", "pretty"):
+        monkeypatch.setattr(langwich.cli, "json_format", json_format)
+        monkeypatch.setattr(langwich.cli, "metadata_backend", "json")
+        langwich.cli.invalidate_metadata_cache()
+        langwich.cli.save_metadata(metadata)
+        written = md_file.read_bytes()
+        assert (b"\n" in written) == (json_format == "pretty")
+
+        # journal compaction
+        monkeypatch.setattr(langwich.cli, "metadata_backend", "journal")
+        langwich.cli.invalidate_metadata_cache()
+        langwich.cli.save_metadata(metadata, changed=["12345"])
+        langwich.cli.get_metadata_journal().compact()
+        assert md_file.read_bytes() == written
+
+        # SQLite export
+        monkeypatch.setattr(langwich.cli, "metadata_backend", "sqlite")
+        langwich.cli.invalidate_metadata_cache()
+        langwich.cli.save_metadata(metadata)
+        md_file.unlink()
+        assert langwich.cli.metadata_db("export")
+        assert md_file.read_bytes() == written
+        langwich.cli.get_metadata_store().close()
+        (tmp_path / "metadata.db").unlink()
+
+def test_get_hashes_after_append(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"12346": {"next_hash": "12347"}, "12347": {"prev_hash": "12346"}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    langwich.cli.invalidate_metadata_cache()
+
+    assert get_hashes("12346") == ["12346", "12347"]
+    tail = langwich.cli.get_text_chain("12346")[-1]
+    langwich.cli.update_metadata(tail, {"prev_hash": "12346", "next_hash": "12348"})
+    langwich.cli.update_metadata("12348", {"prev_hash": tail})
+
+    assert get_hashes("12348") == ["12346", "12347", "12348"]
+    assert get_hashes("12346") == ["12346", "12347", "12348"]
+
+def test_count_text_words():
+    parsed_text = {
+        "ねこ": [{"translation": "cat", "alt_representation": "neko"}, {"translation": "", "skip": True}],
+        "が": [{"translation": ""}],
+    }
+    counts = langwich.cli.count_text_words(parsed_text)
+
+    assert counts == {"translated": 1, "untranslated": 1, "alt_filled": 1, "alt_empty": 1, "skipped": 1}
+
+def test_word_counts_stored_in_metadata(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"12345": {"language": "testing"}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "text_words_dir", tmp_path / "text_words")
+    monkeypatch.setattr(langwich.cli, "current_language", "testing", raising=False)
+    langwich.cli.invalidate_metadata_cache()
+
+    langwich.cli.set_word_counts("12345", {"foo": [{"translation": "bar"}]})
+    langwich.cli.invalidate_metadata_cache()
+
+    # no text_words file exists, so the counters must come from metadata
+    assert langwich.cli.get_word_counts("12345")["translated"] == 1
+    assert langwich.cli.get_word_counts("12346") is None
+
+def test_find_hashes(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text(
+        '{"abc1": {"language": "Testing"}, "abd2": {"language": "testing"},'
+        ' "abd3": {"language": "testing"}, "abd4": {"language": "english"}}'
+    )
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    langwich.cli.invalidate_metadata_cache()
+
+    assert langwich.cli.find_hashes("ab", "testing") == ["abc1", "abd2", "abd3"]
+    assert langwich.cli.find_hashes("abd", "testing") == ["abd2", "abd3"]
+    assert langwich.cli.find_hashes("abd4", "testing") == []
+    assert langwich.cli.get_hash_index("testing")["prefix_len"] == 4
+    assert langwich.cli.get_hash_index("english")["prefix_len"] == 2
+
+def test_manage_backups_catalogs_legacy_copies(monkeypatch, tmp_path):
+    backups = tmp_path / "backups"
+    text_backups = tmp_path / "text_words" / "backups"
+    backups.mkdir()
+    text_backups.mkdir(parents=True)
+    for i in range(12):
+        (backups / f"metadata_202401010000{i:02}.json").write_text("{}")
+        (text_backups / f"abc_202401010000{i:02}.json").write_text("{}")
+    monkeypatch.setattr(langwich.cli, "backups_dir", backups)
+    monkeypatch.setattr(langwich.cli, "text_words_dir", tmp_path / "text_words")
+    monkeypatch.setattr(langwich.cli, "backup_store_dir", backups / "store")
+
+    langwich.cli.manage_backups().join()
+    assert len([f for f in backups.iterdir() if f.suffix == ".json"]) == 10
+    assert len(list(text_backups.iterdir())) == 10
+    assert not (backups / "metadata_20240101000000.json").exists()
+    assert len(langwich.cli.get_backup_store().list_backups("text_words/abc.json")) == 10
+
+def test_fix_metadata_skips_unchanged_texts(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"12345": {"language": "testing", "lang_code": "te", "type": "normal",'
+                       ' "timestamp": "2024-01-01 00:00:00"}}')
+    text_file = tmp_path / "texts" / "testing" / "12345.txt"
+    text_file.parent.mkdir(parents=True)
+    text_file.write_text("one two two")
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "texts_dir", tmp_path / "texts")
+    monkeypatch.setattr(langwich.cli, "backups_dir", tmp_path / "backups")
+    monkeypatch.setattr(langwich.cli, "backup_store_dir", tmp_path / "backups" / "store")
+    monkeypatch.setattr(langwich.cli, "current_language", "testing", raising=False)
+    monkeypatch.setattr(langwich.cli, "word_delims", ",.", raising=False)
+    langwich.cli.invalidate_metadata_cache()
+
+    langwich.cli.fix_metadata(quiet=True)
+    metadata = get_metadata("12345")
+    assert (metadata["num_words"], metadata["num_uniq_words"]) == (3, 2)
+    assert metadata["text_stat"]["size"] == len("one two two")
+
+    stamp = md_file.stat().st_mtime_ns
+    langwich.cli.fix_metadata(quiet=True)
+    assert md_file.stat().st_mtime_ns == stamp
+
+    text_file.write_text("one two three four")
+    langwich.cli.fix_metadata(quiet=True)
+    assert get_metadata("12345")["num_uniq_words"] == 4
+
+    # an entry restored from an older backup has the fingerprint but no counts
+    metadata = json.loads(md_file.read_text())
+    del metadata["12345"]["num_words"], metadata["12345"]["num_uniq_words"]
+    md_file.write_text(json.dumps(metadata))
+    langwich.cli.invalidate_metadata_cache()
+    langwich.cli.fix_metadata(quiet=True)
+    assert (get_metadata("12345")["num_words"], get_metadata("12345")["num_uniq_words"]) == (4, 4)
+
+def test_fix_metadata_removes_deleted_texts_from_frequencies(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}, "22222": {"language": "testing"}}')
+    text_file = tmp_path / "texts" / "testing" / "11111.txt"
+    text_file.parent.mkdir(parents=True)
+    text_file.write_text("cat")
+    (word_index_env / "11111.json").write_text('{"cat": [{"index": 0}]}')
+    (word_index_env / "22222.json").write_text('{"dog": [{"index": 0}, {"index": 1}]}')
+    monkeypatch.setattr(langwich.cli, "texts_dir", tmp_path / "texts")
+    monkeypatch.setattr(langwich.cli, "backups_dir", tmp_path / "backups")
+    monkeypatch.setattr(langwich.cli, "backup_store_dir", tmp_path / "backups" / "store")
+    monkeypatch.setattr(langwich.cli, "word_delims", ",.", raising=False)
+    assert langwich.cli.get_frequency_table().rank("dog") == 1
+
+    # 22222's text file was deleted by hand
+    langwich.cli.fix_metadata(quiet=True)
+    assert "22222" not in langwich.cli.load_metadata()
+    assert langwich.cli.get_frequency_table().top(5) == [("cat", 1, 1)]
+    monkeypatch.setattr(langwich.cli, "_frequency_table", None)
+    assert langwich.cli.get_frequency_table().rank("dog") is None
+
+def test_text_load_many(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text(
+        '{"11111": {"language": "testing", "title": "One", "next_hash": "22222"},'
+        ' "22222": {"language": "testing", "title": "Two", "prev_hash": "11111"},'
+        ' "33333": {"language": "testing", "title": "Three"}}'
+    )
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "current_language", "testing", raising=False)
+    langwich.cli.invalidate_metadata_cache()
+
+    texts = langwich.cli.Text.load_many(["22222", "33333", "99999"])
+    assert sorted(texts) == ["22222", "33333"]
+    assert texts["22222"].title == "Two"
+    assert texts["22222"].hash_list == ["11111", "22222"]
+    assert texts["22222"].prev_hash == "11111"
+    assert texts["22222"].next_hash is None
+    assert not texts["33333"].is_multipart()
+    assert not hasattr(texts["33333"], "__dict__")
+
+def test_query_texts(monkeypatch, tmp_path):
+    counts = '"word_counts": {{"translated": {}, "untranslated": {}, "alt_filled": 0, "alt_empty": 0, "skipped": 0}}'
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text(
+        '{"aaa": {"language": "testing", "title": "A", "fulltext": true, "tag": "news",'
+        ' "last_study_date": "2020-01-01 00:00:00", "study_count": 3, ' + counts.format(1, 1) + '},'
+        ' "bbb": {"language": "testing", "title": "B", "fulltext": true, "study_count": 1, ' + counts.format(4, 0) + '},'
+        ' "ccc": {"language": "testing", "title": "C", "fulltext": false, "label": "Book",'
+        ' "study_count": 0, ' + counts.format(0, 4) + '},'
+        ' "ddd": {"language": "testing", "title": "D", "label": "Book", "last_study_date": null, ' + counts.format(0, 4) + '}}'
+    )
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "current_language", "testing", raising=False)
+    monkeypatch.setattr(langwich.cli, "alt_representation_required", False, raising=False)
+    langwich.cli.invalidate_metadata_cache()
+
+    def titles(**query):
+        return [row["label"] or row["title"] for row in langwich.cli.query_texts(**query)]
+
+    assert titles() == ["Book", "A", "B"]
+    assert titles(label="Book") == ["C", "D"]
+    assert titles(filter="f") == ["B"]
+    assert titles(filter="nf") == ["Book"]
+    assert titles(tag="news") == ["A"]
+    assert titles(percent=(0, 60)) == ["Book", "A"]
+    assert titles(age=30, label="Book") == ["C", "D"]
+    assert titles(sort="date", label="Book") == ["C", "D"]
+    assert titles(sort="-count") == ["A", "B", "Book"]
+    assert titles(sort="percent", limit=2) == ["Book", "A"]
+    assert titles(limit=1) == ["Book"]
+
+def test_short_hashes_are_not_list_filters(monkeypatch, tmp_path):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"a1234": {"language": "testing", "title": "A"}, "f5678": {"language": "testing", "title": "F"}}')
+    monkeypatch.setattr(langwich.cli, "metadata_path", md_file)
+    monkeypatch.setattr(langwich.cli, "current_language", "testing", raising=False)
+    monkeypatch.setattr(langwich.cli, "alt_representation_required", False, raising=False)
+    langwich.cli.invalidate_metadata_cache()
+
+    short_hashes = sorted(row["short_hash"] for row in langwich.cli.query_texts())
+    assert short_hashes == ["a1", "f5"]
+    for short_hash, full_hash in zip(short_hashes, ["a1234", "f5678"]):
+        query = langwich.cli.parse_list_args([short_hash])
+        assert query["filter"] not in ("a", "f", "nf")
+        assert langwich.cli.get_full_hash(query["filter"]) == full_hash
+
+def test_parse_list_args():
+    assert langwich.cli.parse_list_args(["nf", "20"]) == {"filter": "nf", "limit": 20}
+    assert langwich.cli.parse_list_args(["pct:10-50", "sort:-date"]) == {"percent": (10, 50), "sort": "-date"}
+    assert langwich.cli.parse_list_args(["sort:title"]) is None
+
+@pytest.fixture
+def word_index_env(monkeypatch, tmp_path):
+    """
+    Points langwich.cli at a "testing" corpus under tmp_path (metadata.json,
+    text_words/testing/ and words/) with no word index loaded, and returns
+    the text_words dir. Tests write metadata.json and the files themselves.
+    """
+    words_file_dir = tmp_path / "text_words" / "testing"
+    words_file_dir.mkdir(parents=True)
+    monkeypatch.setattr(langwich.cli, "metadata_path", tmp_path / "metadata.json")
+    monkeypatch.setattr(langwich.cli, "text_words_dir", tmp_path / "text_words")
+    monkeypatch.setattr(langwich.cli, "words_dir", tmp_path / "words")
+    monkeypatch.setattr(langwich.cli, "current_language", "testing", raising=False)
+    monkeypatch.setattr(langwich.cli, "frequents", None, raising=False)
+    monkeypatch.setattr(langwich.cli, "alt_representation_required", False, raising=False)
+    monkeypatch.setattr(langwich.cli, "glob_words_index_lang", None, raising=False)
+    monkeypatch.setattr(langwich.cli, "_word_index_dirty", False)
+    monkeypatch.setattr(langwich.cli, "_word_index_stale", False)
+    monkeypatch.setattr(langwich.cli, "_secondary_index_cache", {})
+    monkeypatch.setattr(langwich.cli, "_frequency_table", None)
+    monkeypatch.setattr(langwich.cli, "_review_store", None)
+    unload_word_index(monkeypatch)
+    langwich.cli.invalidate_metadata_cache()
+    return words_file_dir
+
+def unload_word_index(monkeypatch):
+    """Drops the loaded word index, as starting a new session would."""
+    monkeypatch.setattr(langwich.cli, "GLOBAL_WORD_INDEX", None, raising=False)
+    monkeypatch.setattr(langwich.cli, "_word_index_manifest", {"language": None, "files": {}, "secondary": {}})
+
+def test_index_words_splices_changed_files(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}, "22222": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text('{"cat": [{"index": 0, "translation": "kot"}]}')
+    (word_index_env / "22222.json").write_text('{"dog": [{"index": 0}]}')
+
+    assert langwich.cli.index_words("testing")
+    assert sorted(langwich.cli.GLOBAL_WORD_INDEX) == ["cat", "dog"]
+    langwich.cli.flush_word_index()
+    assert (tmp_path / "words" / "testing_manifest.json").exists()
+
+    (word_index_env / "11111.json").write_text('{"cats": [{"index": 0, "translation": "koty"}]}')
+    monkeypatch.setattr(langwich.cli, "_word_index_stale", True)
+    assert langwich.cli.index_words("testing")
+    assert sorted(langwich.cli.GLOBAL_WORD_INDEX) == ["cats", "dog"]
+    assert langwich.cli.GLOBAL_WORD_INDEX["cats"][0]["translation"] == "koty"
+    langwich.cli.flush_word_index()
+
+    # a fresh session picks the saved index up from disk
+    unload_word_index(monkeypatch)
+    (word_index_env / "22222.json").write_text('{"dog": [{"index": 0, "translation": "pes"}]}')
+    assert langwich.cli.index_words("testing")
+    assert langwich.cli.GLOBAL_WORD_INDEX["dog"] == [
+        {"hash": "22222", "list_index": 0, "index": 0, "sent_inx": "", "translation": "pes"}
+    ]
+    assert langwich.cli.GLOBAL_WORD_INDEX["cats"][0]["hash"] == "11111"
+
+def test_update_word_index_patches_records(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}, "22222": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text('{"cat": [{"index": 0}]}')
+    (word_index_env / "22222.json").write_text('{"cat": [{"index": 3, "translation": "kot"}]}')
+    assert langwich.cli.index_words("testing")
+
+    parsed_text = {"cat": [{"index": 0, "translation": "kit", "special_alt_rep": "kat"}]}
+    text_words_file = word_index_env / "11111.json"
+    text_words_file.write_text(json.dumps(parsed_text))
+    langwich.cli.update_word_index("11111", parsed_text, text_words_file)
+
+    index = langwich.cli.GLOBAL_WORD_INDEX
+    assert sorted(r["translation"] for r in index["cat"]) == ["kit", "kot"]
+    assert index["kat"] == [{"word_ptr": "cat", "hash": "11111", "index": 0, "sent_inx": ""}]
+
+    parsed_text = {"cat": [{"index": 0, "translation": "kit"}]}
+    text_words_file.write_text(json.dumps(parsed_text))
+    langwich.cli.update_word_index("11111", parsed_text, text_words_file)
+    assert "kat" not in index
+    assert not (tmp_path / "words" / "testing_index.json").exists()
+
+    langwich.cli.flush_word_index()
+    saved = json.loads((tmp_path / "words" / "testing_index.json").read_text())
+    assert saved == index
+
+def test_binary_word_index_matches_json(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text(
+        '{"cat": [{"index": 0, "sent_inx": 0, "translation": "kot", "special_alt_rep": "kat"}],'
+        ' "dog": [{"index": 1}]}'
+    )
+
+    indexes = {}
+    for word_index_format in ("json", "binary"):
+        monkeypatch.setattr(langwich.cli, "word_index_format", word_index_format)
+        monkeypatch.setattr(langwich.cli, "words_dir", tmp_path / word_index_format)
+        unload_word_index(monkeypatch)
+        assert langwich.cli.index_words("testing")
+        langwich.cli.flush_word_index()
+        # load the saved index as a new session would
+        unload_word_index(monkeypatch)
+        assert langwich.cli.index_words("testing")
+        indexes[word_index_format] = dict(langwich.cli.GLOBAL_WORD_INDEX.items())
+
+    assert isinstance(langwich.cli.GLOBAL_WORD_INDEX, langwich.cli.MappedWordIndex)
+    assert indexes["binary"] == indexes["json"]
+
+def test_colour_sentence_positional_lookup_matches_search(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text(
+        '{"mama": [{"index": 0, "sent_inx": 0, "stress_marks": "2"}, {"index": 1, "sent_inx": 1, "stress_marks": "4"}],'
+        ' "myla": [{"index": 1, "sent_inx": 0, "special_alt_rep": "mila"}],'
+        ' "ramu": [{"index": 2, "sent_inx": 0, "stress_marks": "1"}]}'
+    )
+    monkeypatch.setattr(langwich.cli, "current_hash", "11111", raising=False)
+    monkeypatch.setattr(langwich.cli, "word_delims", ",.", raising=False)
+    monkeypatch.setattr(langwich.cli, "format_delim_word", "__hs__", raising=False)
+    monkeypatch.setattr(langwich.cli, "format_delim_phrase", "__su__", raising=False)
+    assert langwich.cli.index_words("testing")
+
+    sentence = "Mama__hs__mila__hs__ramu."
+    searched = langwich.cli.colour_sentence(sentence, "ramu", [2])
+    positional = langwich.cli.colour_sentence(sentence, "ramu", [2], sent_inx=0)
+    assert positional == searched
+    assert langwich.cli.get_text_positions("11111")[(0, 1)][1][0] == "mila"
+
+def test_find_translations_across_languages(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "japanese"}, "22222": {"language": "ukrainian"}}')
+    for language, text_hash, words in (("japanese", "11111", '{"椅子": [{"index": 0, "translation": "Chair, seat"}]}'),
+                                       ("ukrainian", "22222", '{"стілець": [{"index": 0, "translation": "chair"}]}')):
+        (tmp_path / "text_words" / language).mkdir(parents=True)
+        (tmp_path / "text_words" / language / f"{text_hash}.json").write_text(words)
+
+    assert langwich.cli.index_words("japanese")
+    assert langwich.cli.index_words("ukrainian")
+    assert langwich.cli.find_translations("Chair") == [
+        ("japanese", "椅子", "11111", 0), ("ukrainian", "стілець", "22222", 0)
+    ]
+    assert langwich.cli.find_translations("seat") == [("japanese", "椅子", "11111", 0)]
+
+    monkeypatch.setattr(langwich.cli, "current_language", "ukrainian", raising=False)
+    parsed_text = {"стілець": [{"index": 0, "translation": "stool"}]}
+    text_words_file = tmp_path / "text_words" / "ukrainian" / "22222.json"
+    text_words_file.write_text(json.dumps(parsed_text))
+    langwich.cli.update_word_index("22222", parsed_text, text_words_file)
+    assert langwich.cli.find_translations("chair") == [("japanese", "椅子", "11111", 0)]
+    assert langwich.cli.find_translations("stool") == [("ukrainian", "стілець", "22222", 0)]
+
+def test_base_forms_and_sibling_suggestions(monkeypatch, tmp_path, capsys, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}, "22222": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text(
+        '{"матері": [{"index": 0, "base": "матір,мати", "base_translation": "mother"}],'
+        ' "мати": [{"index": 1, "base": "_w_", "translation": "to have", "base_translation": "_t_"}]}'
+    )
+    (word_index_env / "22222.json").write_text('{"мамо": [{"index": 0, "base": "мама"}]}')
+    (tmp_path / "rules").mkdir()
+    monkeypatch.setattr(langwich.cli, "rules_dir", tmp_path / "rules")
+    assert langwich.cli.index_words("testing")
+
+    assert sorted(langwich.cli.get_base_forms("мати")) == ["матері", "мати"]
+    assert sorted(langwich.cli.get_base_forms("матір")) == ["матері"]
+
+    suggestions, _ = langwich.cli.search_word_index("мамо", base="мати", search_keys=["base_translation"])
+    assert sorted(suggestions) == ["mother", "to have"]
+
+    langwich.cli.show_paradigm("матері")
+    out = capsys.readouterr().out
+    assert "мати" in out and "матір" in out and "to have" in out
+
+    # postings are stored flat per key
+    langwich.cli.flush_word_index()
+    bases = json.loads((tmp_path / "words" / "testing_bases.json").read_text())
+    assert bases["мати"] == ["11111", "матері", 0, "11111", "мати", 0]
+
+    # a saved index without the bases index gets it rebuilt on load
+    (tmp_path / "words" / "testing_bases.json").unlink()
+    unload_word_index(monkeypatch)
+    assert langwich.cli.index_words("testing")
+    assert sorted(langwich.cli.get_base_forms("мати")) == ["матері", "мати"]
+
+    # and so does one in the older [[word, hash, list_index], ...] shape
+    langwich.cli.flush_word_index()
+    (tmp_path / "words" / "testing_bases.json").write_text('{"мати": [["мати", "11111", 0]]}')
+    unload_word_index(monkeypatch)
+    assert langwich.cli.index_words("testing")
+    assert sorted(langwich.cli.get_base_forms("мати")) == ["матері", "мати"]
+
+def test_study_include_filters(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}, "22222": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text(
+        '{"run": [{"index": 0, "sent_inx": 0, "type": "verb", "tags": "n5, motion"}],'
+        ' "cat": [{"index": 1, "sent_inx": 0, "type": "noun", "tags": "n5"}]}'
+    )
+    (word_index_env / "22222.json").write_text('{"walk": [{"index": 0, "sent_inx": 0, "type": "verb"}]}')
+    assert langwich.cli.index_words("testing")
+
+    def words(**filters):
+        return langwich.cli.get_word_data(alt=True, include_filters=filters)["all_words"]
+    assert words(types=["v"]) == ["run", "walk"]
+    assert words(tags=["n5"]) == ["run", "cat"]
+    assert words(types=["v"], tags=["n5"]) == ["run"]
+    assert words(types=["v", "n"], tags=["motion"]) == ["run"]
+    assert words(tags=["n4"]) == []
+    streamed = langwich.cli.iter_word_data(include_filters={"types": ["v"]})
+    assert [w for w, _, _, _, _ in streamed] == ["run", "walk"]
+
+    assert langwich.cli.parse_study_args(["testing", "123", "verb", "tag:n5"]) == {
+        "short_hash": "123", "include_filters": {"types": ["v"], "tags": ["n5"]}
+    }
+    assert langwich.cli.parse_study_args(["n", "type:adjective"]) == {"include_filters": {"types": ["n", "a"]}}
+    assert langwich.cli.parse_study_args(["123", "456"]) is None
+
+    # short hashes copied from "list" can look like type abbreviations
+    md_file.write_text('{"ab345": {"language": "testing"}, "11111": {"language": "testing"}}')
+    langwich.cli.invalidate_metadata_cache()
+    assert langwich.cli.parse_study_args(["ab"]) == {"short_hash": "ab"}
+    assert langwich.cli.parse_study_args(["ab", "ad"]) == {"short_hash": "ab", "include_filters": {"types": ["ad"]}}
+
+def test_promoted_deferred_records_are_filtered(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text(
+        '{"the": [{"index": 0, "sent_inx": 0, "type": "verb", "tags": "n5"}],'
+        ' "cat": [{"index": 1, "sent_inx": 0, "type": "noun", "tags": "n5"}]}'
+    )
+    monkeypatch.setattr(langwich.cli, "frequents", ["the"])
+    # "the" is deferred and stays deferred on the first reindex
+    monkeypatch.setattr(langwich.cli.random, "shuffle", lambda x: x.reverse())
+    monkeypatch.setattr(langwich.cli.random, "randrange", lambda n: 1)
+    assert langwich.cli.index_words("testing")
+    entry = langwich.cli._word_index_manifest["files"]["11111"]
+    assert entry["deferred"] == [["the", {"hash": "11111", "list_index": 0, "index": 0, "sent_inx": 0,
+                                           "type": "v", "tags": "n5"}]]
+    assert "the" not in langwich.cli.GLOBAL_WORD_INDEX
+
+    monkeypatch.setattr(langwich.cli.random, "randrange", lambda n: 0)
+    monkeypatch.setattr(langwich.cli, "_word_index_stale", True)
+    assert langwich.cli.index_words("testing")
+    assert entry["deferred"] == []
+    assert entry["types"] == ["n", "v"]
+
+    def words(**filters):
+        return [w for w, _, _, _, _ in langwich.cli.iter_word_data(include_filters=filters)]
+    assert words(types=["v"]) == ["the"]
+    assert words(tags=["n5"]) == ["the", "cat"]
+    assert langwich.cli.get_word_data(alt=True, include_filters={"types": ["v"], "tags": ["n5"]})["all_words"] == ["the"]
+
+def test_frequent_rank_uses_the_frequency_table(monkeypatch, tmp_path, word_index_env):
+    (word_index_env / "11111.json").write_text(
+        '{"the": [{"index": 0}, {"index": 2}], "cat": [{"index": 1}], ".": [{"index": 3, "skip": true}]}'
+    )
+    monkeypatch.setattr(langwich.cli, "frequents", ["cat"], raising=False)
+
+    # without a frequent_rank the language's list is used
+    assert langwich.cli.is_frequent("cat")
+    assert not langwich.cli.is_frequent("the")
+
+    monkeypatch.setattr(langwich.cli, "frequent_rank", 1)
+    assert langwich.cli.is_frequent("the")
+    assert not langwich.cli.is_frequent("cat")
+    assert (tmp_path / "words" / "testing_freq.json").exists()
+
+    parsed_text = {"cat": [{"index": 0}, {"index": 1}, {"index": 2}], "the": [{"index": 3}]}
+    langwich.cli.update_frequencies("11111", parsed_text)
+    assert langwich.cli.is_frequent("cat")
+    assert langwich.cli.get_frequency_table().top(5) == [("cat", 3, 1), ("the", 1, 1)]
+
+def test_parallel_index_build_matches_serial(monkeypatch, tmp_path, word_index_env):
+    metadata = {}
+    for i in range(20):
+        text_hash = f"{10000 + i}"
+        metadata[text_hash] = {"language": "testing"}
+        (word_index_env / f"{text_hash}.json").write_text(json.dumps({
+            "cat": [{"index": 0, "sent_inx": 0, "base": "cat", "translation": f"kot{i}"}],
+            f"word{i % 3}": [{"index": 1, "sent_inx": 0, "special_alt_rep": f"alt{i}"}]
+        }))
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text(json.dumps(metadata))
+
+    built = {}
+    for jobs in (1, 2):
+        monkeypatch.setattr(langwich.cli, "index_jobs", jobs)
+        unload_word_index(monkeypatch)
+        assert langwich.cli.index_words("testing")
+        built[jobs] = (json.dumps(langwich.cli.GLOBAL_WORD_INDEX, default=dict),
+                       json.dumps(langwich.cli._word_index_manifest["secondary"]),
+                       json.dumps(langwich.cli._word_index_manifest["files"]))
+    assert built[1] == built[2]
+    assert len(langwich.cli.GLOBAL_WORD_INDEX["cat"]) == 20
+
+def test_get_word_data_columns(monkeypatch, word_index_env):
+    word_index = {
+        "cat": [{"hash": "22222", "list_index": 0, "index": 1, "sent_inx": 0, "translation": "kot"},
+                {"hash": "11111", "list_index": 0, "index": 4, "sent_inx": 2, "translation": "kot"}],
+        "dog": [{"hash": "11111", "list_index": 0, "index": 0, "sent_inx": 2, "translation": "_w_"},
+                {"hash": "11111", "list_index": 1, "index": 3, "sent_inx": "", "translation": "pes"}],
+        "kat": [{"word_ptr": "cat", "hash": "11111", "index": 4, "sent_inx": 2}],
+        "owl": [{"hash": "11111", "list_index": 0, "index": 2, "sent_inx": 0}]
+    }
+    monkeypatch.setattr(langwich.cli, "GLOBAL_WORD_INDEX", word_index, raising=False)
+
+    data = langwich.cli.get_word_data(alt=True, exclude_filters={"translation": ""})
+    assert data["all_words"] == ["dog", "dog", "cat", "cat"]
+    assert data["all_hashes"] == ["11111", "11111", "11111", "22222"]
+    assert data["all_hashes"][0] is data["all_hashes"][1]
+    assert data["all_sent_inxs"] == array("i", [-1, 2, 2, 0])
+    assert data["all_word_inxs"] == array("i", [3, 0, 4, 1])
+    assert data["all_list_inxs"] == array("i", [1, 0, 0, 0])
+
+    data = langwich.cli.get_word_data(hash_list=["22222"], randomize=True)
+    assert data["all_words"] == ["cat"]
+    data = langwich.cli.get_word_data(exclude_filters={"translation": "dog"})
+    assert data["all_words"] == ["cat", "cat", "dog", "owl"]
+
+def test_iter_word_data_streams_by_text(monkeypatch, tmp_path, word_index_env):
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"11111": {"language": "testing"}, "22222": {"language": "testing"}}')
+    (word_index_env / "11111.json").write_text(
+        '{"dog": [{"index": 0, "sent_inx": 2, "translation": "dog"}, {"index": 3, "translation": "pes"}],'
+        ' "cat": [{"index": 4, "sent_inx": 2, "translation": "kot", "special_alt_rep": "kat"}],'
+        ' "owl": [{"index": 2, "sent_inx": 0}]}'
+    )
+    (word_index_env / "22222.json").write_text('{"cat": [{"index": 1, "sent_inx": 0, "translation": "kot"}]}')
+    assert langwich.cli.index_words("testing")
+    files = langwich.cli._word_index_manifest["files"]
+    assert "queue" not in files["11111"]
+    rows = langwich.cli._text_queue_rows("11111", files["11111"])
+    assert rows[:2] == [["dog", 1, 3, -1, 1], ["owl", 0, 2, 0, 0]]
+    data = langwich.cli.get_word_data(exclude_filters={"translation": ""})
+    # the queue rows are read instead of the index records
+    monkeypatch.setattr(langwich.cli, "GLOBAL_WORD_INDEX", {})
+
+    queue = langwich.cli.iter_word_data(translated_only=True)
+    assert next(queue) == ("dog", "11111", 1, 3, -1)
+    assert list(queue) == [("dog", "11111", 0, 0, 2), ("cat", "11111", 0, 4, 2), ("cat", "22222", 0, 1, 0)]
+
+    # same candidates as the full queue, in any order
+    streamed = list(langwich.cli.iter_word_data(randomize=True, translated_only=True))
+    assert sorted((w, h, list_inx) for w, h, list_inx, _, _ in streamed) == sorted(zip(data["all_words"], data["all_hashes"], data["all_list_inxs"]))
+
+    # with one text per block every text's words come together
+    streamed = list(langwich.cli.iter_word_data(randomize=True, block_size=1))
+    hashes = [h for _, h, _, _, _ in streamed]
+    assert hashes in (["11111"]*4 + ["22222"], ["22222"] + ["11111"]*4)
+    assert [w for w, _, _, _, _ in langwich.cli.iter_word_data(hash_list=["22222", "44444"])] == ["cat"]
+
+    # records the manifest still defers are left out
+    files["11111"]["deferred"] = [["owl", {"hash": "11111", "list_index": 0, "index": 2, "sent_inx": 0}]]
+    assert [w for w, _, _, _, _ in langwich.cli.iter_word_data(hash_list=["11111"])] == ["dog", "dog", "cat"]
+
+def test_study_due_queue(monkeypatch, tmp_path, word_index_env):
+    word_index = {
+        "cat": [{"hash": "11111", "list_index": 0, "index": 4, "sent_inx": 2, "translation": "kot"}],
+        "dog": [{"hash": "11111", "list_index": 0, "index": 0, "sent_inx": 2, "translation": ""},
+                {"hash": "22222", "list_index": 0, "index": 3, "sent_inx": "", "translation": "pes"}],
+        "owl": [{"hash": "11111", "list_index": 0, "index": 2, "sent_inx": 0, "translation": "sova"}]
+    }
+    monkeypatch.setattr(langwich.cli, "GLOBAL_WORD_INDEX", word_index, raising=False)
+
+    store = langwich.cli.get_review_store()
+    store.grade("owl", 1, now=0)
+    store.grade("dog", 1, now=10)
+    # not due for a week
+    store.grade("cat", 4)
+    store.grade("cat", 4)
+    assert list(langwich.cli.iter_due_words(5)) == [("owl", "11111", 0, 2, 0), ("dog", "22222", 0, 3, -1)]
+    assert list(langwich.cli.iter_due_words(1, hash_list=["11111"])) == [("owl", "11111", 0, 2, 0)]
+
+    langwich.cli.flush_reviews()
+    assert (tmp_path / "words" / "testing_reviews.json").exists()
+    monkeypatch.setattr(langwich.cli, "_review_store", None)
+    assert langwich.cli.get_review_store().cards == store.cards
+
+    monkeypatch.setattr(langwich.cli, "review_count", 20)
+    assert langwich.cli.parse_study_args(["due"]) == {"due": 20}
+    assert langwich.cli.parse_study_args(["123", "due", "5", "verb"]) == {
+        "short_hash": "123", "due": 5, "include_filters": {"types": ["v"]}
+    }
+    assert langwich.cli.parse_study_args(["due", "tag:n5"]) == {"due": 20, "include_filters": {"tags": ["n5"]}}
+    md_file = tmp_path / "metadata.json"
+    md_file.write_text('{"12435": {"language": "testing"}}')
+    langwich.cli.invalidate_metadata_cache()
+    assert langwich.cli.parse_study_args(["due", "12435"]) == {"due": 20, "short_hash": "12435"}
+
+    # reverse study has its own schedule
+    langwich.cli.get_review_store(reverse=True).grade("emu", 1, now=0)
+    assert "emu" not in langwich.cli.get_review_store().cards
+    assert "emu" in langwich.cli.get_review_store(reverse=True).cards
+    assert (tmp_path / "words" / "testing_rev_reviews.json").exists()
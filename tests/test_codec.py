@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from langwich.core import codec
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(codec, "orjson", None)
+    elif codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+def test_round_trip(backend, tmp_path):
+    data = {"мама": [{"index": 0, "sent_inx": "", "translation": "mom", "skip": False}], "の": []}
+    for compact in (True, False):
+        path = tmp_path / f"{compact}.json"
+        codec.dump(data, path, compact=compact)
+        assert codec.load(path) == data
+
+def test_compact_is_smaller(backend):
+    data = {"мама": [{"index": i, "translation": "mom"} for i in range(10)]}
+    assert len(codec.dumps(data)) < len(codec.dumps(data, compact=False)) * 2 // 3
+    assert b"\n" not in codec.dumps(data)
+
+def test_files_written_by_json_dump_load(backend, tmp_path):
+    data = {"мама": [{"index": 0}]}
+    path = tmp_path / "old.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    assert codec.load(path) == data
+    with pytest.raises(ValueError):
+        codec.loads(b"{")
@@ -0,0 +1,32 @@
+from langwich.core.frequency import FrequencyTable, word_frequencies
+
+def test_word_frequencies_leaves_out_skipped_words():
+    parsed_text = {"の": [{"index": 1}, {"index": 3}], "、": [{"index": 2, "skip": True}]}
+    assert word_frequencies(parsed_text) == {"の": 2}
+
+def test_replacing_a_text_updates_counts_and_ranks(tmp_path):
+    table = FrequencyTable(tmp_path / "testing_freq.json")
+    table.set_text("11111", {"a": 3, "b": 1})
+    table.set_text("22222", {"b": 1, "c": 2})
+    assert table.top(3) == [("a", 3, 1), ("b", 2, 2), ("c", 2, 1)]
+
+    table.set_text("11111", {"b": 2})
+    assert table.top(3) == [("b", 3, 2), ("c", 2, 1)]
+    assert table.rank("a") is None
+
+    table.remove_text("22222")
+    assert table.top(3) == [("b", 2, 1)]
+
+def test_save_and_load(tmp_path):
+    table = FrequencyTable(tmp_path / "testing_freq.json")
+    assert table.load() is False
+    table.set_text("11111", {"a": 3, "b": 1})
+    assert table.dirty
+    table.save()
+    assert not table.dirty
+
+    loaded = FrequencyTable(tmp_path / "testing_freq.json")
+    assert loaded.load() is True
+    assert loaded.rank("a") == 1 and loaded.rank("b") == 2
+    loaded.set_text("11111", {"a": 3, "b": 1})
+    assert not loaded.dirty
@@ -0,0 +1,68 @@
+import json
+from langwich.core.metadata_journal import MetadataJournal
+
+def make_journal(tmp_path, **kwargs):
+    snapshot = tmp_path / "metadata.json"
+    snapshot.write_text('{"12345": {"title": "foo"}, "12346": {"title": "bar"}}')
+    return MetadataJournal(snapshot, **kwargs)
+
+def test_writes_append_to_journal(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.put("12345", {"title": "foo", "study_count": 1})
+    journal.delete_many(["12346"])
+
+    assert journal.get_all() == {"12345": {"title": "foo", "study_count": 1}}
+    # the snapshot itself is untouched until compaction
+    with open(journal.snapshot_path) as f:
+        assert json.load(f)["12345"] == {"title": "foo"}
+
+def test_compact_folds_journal_into_snapshot(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.put("12347", {"title": "baz"})
+    journal.compact()
+
+    assert not journal.has_journal()
+    with open(journal.snapshot_path) as f:
+        assert json.load(f)["12347"] == {"title": "baz"}
+
+def test_torn_last_record_is_ignored(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.put("12345", {"title": "new"})
+    with open(journal.journal_path, "a") as f:
+        f.write('{"hash": "12346", "pu')
+
+    assert journal.get_all()["12345"] == {"title": "new"}
+    assert journal.get_all()["12346"] == {"title": "bar"}
+
+def test_size_threshold_triggers_background_compaction(tmp_path):
+    journal = make_journal(tmp_path, max_journal_size=10)
+    journal.put("12345", {"title": "new"})
+    journal.wait()
+
+    assert not journal.has_journal()
+    assert journal.get_all()["12345"] == {"title": "new"}
+
+def test_append_after_torn_record_keeps_new_records(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.put("a", {"n": 1})
+    with open(journal.journal_path, "a") as f:
+        f.write('{"hash": "a", "pu')
+    journal.put("a", {"n": 2})
+    journal.put("b", {"n": 1})
+
+    metadata = journal.get_all()
+    assert metadata["a"] == {"n": 2}
+    assert metadata["b"] == {"n": 1}
+
+def test_foreground_compaction_waits_for_background_one(tmp_path):
+    journal = make_journal(tmp_path, max_journal_size=10)
+    journal.put("12345", {"title": "new"})
+    # the threshold started a background compaction; records written
+    # meanwhile go to a fresh journal that must be folded too
+    journal.put("12347", {"title": "baz"})
+    journal.compact()
+
+    assert not journal.has_journal()
+    with open(journal.snapshot_path) as f:
+        snapshot = json.load(f)
+    assert snapshot["12345"] == {"title": "new"} and snapshot["12347"] == {"title": "baz"}
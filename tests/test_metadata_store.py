@@ -0,0 +1,43 @@
+import json
+from langwich.core.metadata_store import SqliteMetadataStore
+
+def make_store(tmp_path):
+    return SqliteMetadataStore(tmp_path / "metadata.db")
+
+def test_put_and_get(tmp_path):
+    store = make_store(tmp_path)
+    store.put("12345", {"language": "Japanese", "title": "foo"})
+
+    assert store.get("12345") == {"language": "Japanese", "title": "foo"}
+    assert store.get("99999") is None
+
+def test_put_updates_single_row_in_place(tmp_path):
+    store = make_store(tmp_path)
+    store.put_many({"a": {"n": 1}, "b": {"n": 2}, "c": {"n": 3}})
+    store.put("b", {"n": 20})
+
+    # updating a row must not move it to the end
+    assert list(store.get_all().items()) == [("a", {"n": 1}), ("b", {"n": 20}), ("c", {"n": 3})]
+
+def test_indexed_columns(tmp_path):
+    store = make_store(tmp_path)
+    store.put("12346", {"language": "Ukrainian", "next_hash": "12347", "hidden": "true"})
+
+    row = store.connect().execute(
+        "SELECT language, next_hash, hidden FROM texts WHERE hash = ?", ("12346",)
+    ).fetchone()
+    assert row == ("ukrainian", "12347", 1)
+
+def test_import_and_export_json(tmp_path):
+    store = make_store(tmp_path)
+    num_texts = store.import_json("./tests/data/metadata.json")
+    store.delete_many(["abcde"])
+    export_path = tmp_path / "metadata.json"
+    store.export_json(export_path)
+
+    with open("./tests/data/metadata.json") as f:
+        expected = json.load(f)
+    del expected["abcde"]
+    with open(export_path) as f:
+        assert json.load(f) == expected
+    assert num_texts == 9
@@ -0,0 +1,46 @@
+from langwich.core.review_store import DAY, MIN_EASE, ReviewStore
+
+def test_sm2_intervals_and_lapses(tmp_path):
+    store = ReviewStore(tmp_path / "testing_reviews.json")
+    assert store.grade("cat", 4, now=0)["interval"] == 1
+    assert store.grade("cat", 4, now=DAY)["interval"] == 6
+    card = store.grade("cat", 5, now=7*DAY)
+    assert card["interval"] == 15.0 and card["ease"] == 2.6
+    assert card["due"] == 22*DAY and card["last_seen"] == 7*DAY
+
+    card = store.grade("cat", 1, now=22*DAY)
+    assert card["interval"] == 1 and card["reps"] == 0 and card["lapses"] == 1
+    assert card["ease"] == 2.06
+    for i in range(5):
+        card = store.grade("cat", 0, now=(23+i)*DAY)
+    assert card["ease"] == MIN_EASE and card["lapses"] == 1
+
+def test_due_pops_earliest_first(tmp_path):
+    store = ReviewStore(tmp_path / "testing_reviews.json")
+    store.grade("cat", 1, now=0)
+    store.grade("dog", 1, now=100)
+    store.grade("owl", 4, now=50)
+    store.grade("owl", 4, now=50 + DAY)
+    assert store.due(10, now=DAY + 200) == ["cat", "dog"]
+    # popping doesn't take words out of the schedule
+    assert store.due(1, now=DAY + 200) == ["cat"]
+    assert store.due(10, now=DAY + 200, keep=lambda w: w != "cat") == ["dog"]
+
+    # a graded word moves to its new due time
+    store.grade("cat", 4, now=DAY + 200)
+    assert store.due(10, now=DAY + 200) == ["dog"]
+    assert store.due(10, now=8*DAY) == ["dog", "cat", "owl"]
+
+def test_save_and_load(tmp_path):
+    store = ReviewStore(tmp_path / "testing_reviews.json")
+    assert store.load() is False
+    store.grade("cat", 1, now=0)
+    store.grade("dog", 4, now=0)
+    assert store.dirty
+    store.save()
+    assert not store.dirty
+
+    loaded = ReviewStore(tmp_path / "testing_reviews.json")
+    assert loaded.load() is True
+    assert loaded.cards == store.cards
+    assert loaded.due(10, now=2*DAY) == ["cat", "dog"]
@@ -0,0 +1,96 @@
+import pickle
+import tracemalloc
+
+from langwich.core.word_index import IndexRecord, MappedWordIndex, write_word_index
+
+WORD_INDEX = {
+    "кіт": [
+        {"hash": "11111", "list_index": 0, "index": 2, "sent_inx": 0, "type": "n",
+         "base": "_w_", "translation": "cat", "special_alt_rep": "kit"},
+        {"hash": "22222", "list_index": 1, "index": -1, "sent_inx": ""}
+    ],
+    "kit": [{"word_ptr": "кіт", "hash": "11111", "index": 2}],
+    "dog": [{"hash": "22222", "list_index": 0, "index": 5, "sent_inx": 1, "stress_marks": 1, "note": ["x"]}]
+}
+
+def write_index(tmp_path):
+    path = tmp_path / "testing_index.bin"
+    write_word_index(path, WORD_INDEX)
+    return MappedWordIndex(path)
+
+def test_round_trip(tmp_path):
+    index = write_index(tmp_path)
+    assert len(index) == 3
+    assert dict(index.items()) == WORD_INDEX
+    assert list(index["kit"][0]) == ["word_ptr", "hash", "index"]
+    assert "cat" not in index
+    assert index.get("cat") is None
+
+def test_overlay(tmp_path):
+    index = write_index(tmp_path)
+    index.setdefault("dog", []).append({"hash": "33333", "list_index": 0, "index": 0, "sent_inx": 0})
+    index["cat"] = [{"hash": "33333", "list_index": 1, "index": 1, "sent_inx": 0}]
+    del index["kit"]
+    index["kit"] = [{"word_ptr": "кіт", "hash": "22222", "index": 2}]
+
+    assert len(index["dog"]) == 2
+    assert sorted(index) == ["cat", "dog", "kit", "кіт"]
+    assert len(index) == 4
+
+    write_word_index(tmp_path / "copy.bin", index)
+    assert dict(MappedWordIndex(tmp_path / "copy.bin").items()) == dict(index.items())
+
+def test_reads_are_not_kept(tmp_path):
+    index = write_index(tmp_path)
+    assert index["dog"] == WORD_INDEX["dog"]
+    assert index.get("кіт") == WORD_INDEX["кіт"]
+    assert len(dict(index.items())) == 3
+    assert index._overlay == {}
+
+    # setdefault() hands out the list that is kept, as a dict would
+    index.setdefault("dog", []).append({"hash": "33333", "list_index": 0, "index": 0, "sent_inx": 0})
+    assert list(index._overlay) == ["dog"]
+    assert len(index["dog"]) == 2
+
+def test_close_keeps_overlay_and_frees_mapping(tmp_path):
+    index = write_index(tmp_path)
+    records = index["dog"]
+    index.close()
+    assert index._mm.closed
+    assert records == WORD_INDEX["dog"]
+
+def test_index_record_works_like_a_dict():
+    fields = WORD_INDEX["кіт"][0]
+    record = IndexRecord(fields)
+    assert record == fields and fields == record
+    assert record["translation"] == "cat"
+    assert record.get("tags") is None and record.get("tags", "") == ""
+    assert "base" in record and "word_ptr" not in record
+    assert list(record) == list(fields)
+
+    record["tags"] = "n5"
+    assert record.to_dict() == dict(fields, tags="n5")
+    del record["tags"]
+    assert record == fields
+    assert pickle.loads(pickle.dumps(record)) == record
+
+def test_records_share_keys_and_hashes():
+    first = IndexRecord({"hash": "".join(["111", "11"]), "list_index": 0, "index": 0, "sent_inx": 0})
+    second = IndexRecord({"hash": "".join(["11", "111"]), "list_index": 1, "index": 3, "sent_inx": 0})
+    assert first._keys is second._keys
+    assert first["hash"] is second["hash"]
+
+def test_index_record_memory():
+    def traced_size(make_record):
+        tracemalloc.start()
+        records = [make_record({"hash": str(1700000000 + i % 50), "list_index": i % 7, "index": i % 12,
+                                "sent_inx": i % 300, "type": "n", "translation": "cat"})
+                   for i in range(20000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(records) == 20000
+        return size
+
+    dict_size = traced_size(dict)
+    record_size = traced_size(IndexRecord)
+    assert record_size < dict_size * 0.6
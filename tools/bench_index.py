@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import langwich.cli as cli
+
+# Times a full word index build (no manifest) of a synthetic corpus with one
+# process and with a pool of --jobs processes.
+#   python tools/bench_index.py --texts 400 --words 3000 --jobs 8
+
+parser = argparse.ArgumentParser(description="Benchmark the parallel word index build.")
+parser.add_argument("--texts", type=int, default=400)
+parser.add_argument("--words", type=int, default=3000, help="words per text")
+parser.add_argument("--jobs", type=int, default=os.cpu_count())
+args = parser.parse_args()
+
+random.seed(0)
+vocabulary = [f"word{i}" for i in range(20000)]
+with tempfile.TemporaryDirectory() as tmp_dir:
+    words_file_dir = os.path.join(tmp_dir, "text_words", "testing")
+    os.makedirs(words_file_dir)
+    metadata = {}
+    for t in range(args.texts):
+        text_hash = str(10**9 + t)
+        metadata[text_hash] = {"language": "testing"}
+        parsed_text = {}
+        for i in range(args.words):
+            word = random.choice(vocabulary)
+            parsed_text.setdefault(word, []).append({
+                "index": i % 12, "sent_inx": i // 12, "type": "noun", "base": word,
+                "translation": f"meaning of {word}", "base_translation": f"meaning of {word}"
+            })
+        with open(os.path.join(words_file_dir, f"{text_hash}.json"), "w", encoding="utf-8") as f:
+            json.dump(parsed_text, f)
+    with open(os.path.join(tmp_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+
+    cli.metadata_path = os.path.join(tmp_dir, "metadata.json")
+    cli.text_words_dir = os.path.join(tmp_dir, "text_words")
+    cli.words_dir = os.path.join(tmp_dir, "words")
+    cli.frequents = None
+    cli.alt_representation_required = False
+
+    timings = {}
+    for jobs in sorted({1, args.jobs}):
+        cli.index_jobs = jobs
+        cli.GLOBAL_WORD_INDEX = None
+        cli.glob_words_index_lang = None
+        cli._word_index_manifest = {"language": None, "files": {}, "secondary": {}}
+        start = time.perf_counter()
+        cli.index_words("testing")
+        timings[jobs] = time.perf_counter() - start
+        print(f"jobs={jobs}: {timings[jobs]:.2f}s")
+    print(f"speedup: {timings[1] / timings[args.jobs]:.1f}x")